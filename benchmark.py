@@ -0,0 +1,301 @@
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import qrcode
+
+from ticket import HallTicketGenerator, QREngine, TicketRegistry, TicketVerifier, signed_qr_payload
+
+SAMPLE_CSV = "exam_schedule1 (1).csv"
+SCHEDULE_COLUMNS = ["Student Name", "Roll Number", "Course", "Semester"] + [
+    f"{field} {i}" for i in range(1, 7) for field in ("Subject", "Date", "Time")]
+
+
+def load_sample_students(csv_path=SAMPLE_CSV):
+    with open(csv_path, 'r', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def time_tickets(generator, students, repeat):
+    # Returns the mean wall-clock milliseconds spent drawing each ticket; encoding and
+    # writing the file are left out since the template does not change them
+    start = time.perf_counter()
+    count = 0
+    for _ in range(repeat):
+        for student in students:
+            generator.render_hall_ticket(student)
+            count += 1
+    return (time.perf_counter() - start) * 1000 / max(count, 1)
+
+
+def bench_template(args):
+    students = load_sample_students(args.csv)[:args.rows]
+    with tempfile.TemporaryDirectory() as output_dir:
+        results = {}
+        for label, use_template in (("redraw", False), ("template", True)):
+            # The text sprite cache is off on both sides so only the template's effect is measured
+            generator = HallTicketGenerator(args.csv, output_dir, use_template=use_template,
+                                            text_cache_bytes=0)
+            # Warm-up ticket so the template (and fonts) are not charged to the first row
+            generator.render_hall_ticket(students[0])
+            results[label] = time_tickets(generator, students, args.repeat)
+    print(f"Static layout benchmark ({len(students)} tickets x {args.repeat})")
+    for label, ms in results.items():
+        print(f"  {label:<10} {ms:8.2f} ms/ticket")
+    print(f"  speedup    {results['redraw'] / results['template']:8.2f}x")
+    return results
+
+
+def legacy_qr_image(student_data, qr_size=120):
+    # The original per-ticket path: fitted QRCode object, box_size=8 image, then resize
+    qr_data = {
+        'name': student_data['Student Name'],
+        'roll': student_data['Roll Number'],
+        'course': student_data['Course'],
+        'semester': student_data['Semester']
+    }
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=8, border=4)
+    qr.add_data(json.dumps(qr_data))
+    qr.make(fit=True)
+    return qr.make_image(fill_color="black", back_color="white").resize((qr_size, qr_size))
+
+
+def bench_qr(args):
+    students = load_sample_students(args.csv)[:args.rows]
+    payloads = [json.dumps({
+        'name': student['Student Name'],
+        'roll': student['Roll Number'],
+        'course': student['Course'],
+        'semester': student['Semester']
+    }) for student in students]
+    count = len(students) * args.repeat
+    
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for student in students:
+            legacy_qr_image(student)
+    legacy_ms = (time.perf_counter() - start) * 1000 / count
+    
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        # A fresh engine each pass, as every run starts with one
+        engine = QREngine(size=120)
+        for payload in payloads:
+            engine.image(payload)
+    engine_ms = (time.perf_counter() - start) * 1000 / count
+    
+    print(f"QR encoding benchmark ({len(students)} payloads x {args.repeat})")
+    print(f"  legacy     {legacy_ms:8.3f} ms/ticket")
+    print(f"  engine     {engine_ms:8.3f} ms/ticket (version {engine.version})")
+    print(f"  speedup    {legacy_ms / engine_ms:8.2f}x")
+    return {'legacy_ms': legacy_ms, 'engine_ms': engine_ms}
+
+
+def bench_encode(args):
+    # Per-ticket file size and save time for each image mode / container combination
+    students = load_sample_students(args.csv)[:args.rows]
+    configs = [("RGB png (old)", "RGB", "png", {}), ("L png", "L", "png", {}),
+               ("1 png", "1", "png", {}), ("L png level 1", "L", "png", {'png_compress_level': 1}),
+               ("L png optimize", "L", "png", {'png_optimize': True}),
+               ("L webp lossless", "L", "webp", {}), ("1 tiff g4", "1", "tiff", {})]
+    results = {}
+    print(f"Image encoding benchmark ({len(students)} tickets)")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for label, mode, output_format, options in configs:
+            generator = HallTicketGenerator(args.csv, output_dir, image_mode=mode, output_format=output_format,
+                                            **options)
+            images = [(generator.render_hall_ticket(student), student) for student in students]
+            start = time.perf_counter()
+            paths = [generator.write_hall_ticket(image, student) for image, student in images]
+            save_ms = (time.perf_counter() - start) * 1000 / len(paths)
+            size_kb = sum(os.path.getsize(path) for path in paths) / len(paths) / 1024
+            results[label] = {'save_ms': save_ms, 'size_kb': size_kb}
+            print(f"  {label:<18} {size_kb:7.1f} KB {save_ms:8.2f} ms/ticket")
+    return results
+
+
+def bench_verify(args):
+    # Gate-scan load test: registers synthetic tickets, then replays scans across threads
+    secret = "benchmark-secret"
+    students = [{
+        'Student Name': f"Student {i}",
+        'Roll Number': f"R{i:08d}",
+        'Course': "MCA",
+        'Semester': "III"
+    } for i in range(args.tickets)]
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "tickets.db")
+        registry = TicketRegistry(db_path)
+        registry.register(students, secret)
+        payloads = [signed_qr_payload(secret, student) for student in students]
+        verifier = TicketVerifier(db_path, secret)
+        
+        def scan(chunk):
+            return sum(1 for payload in chunk if verifier.verify(payload)[0] == "valid")
+        
+        chunks = [payloads[i::args.threads] for i in range(args.threads)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            valid = sum(executor.map(scan, chunks))
+        elapsed = time.perf_counter() - start
+    print(f"Verification load test ({len(payloads)} scans, {args.threads} threads)")
+    print(f"  valid      {valid}")
+    print(f"  throughput {len(payloads) / elapsed:10.0f} scans/s")
+    print(f"  payload    {len(payloads[0])} chars, e.g. {payloads[0]}")
+    return {'scans_per_second': len(payloads) / elapsed, 'threads': args.threads}
+
+
+def bench_startup(args):
+    # Import cost of the ticket module as a batch job sees it, best of several fresh interpreters
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = ("import sys, time; start = time.perf_counter(); import ticket; "
+             "print((time.perf_counter() - start) * 1000); "
+             "print(','.join(m for m in ('tkinter', 'werkzeug', 'sqlite3') if m in sys.modules))")
+    timings = []
+    for _ in range(args.repeat):
+        output = subprocess.run([sys.executable, "-c", probe], cwd=here, capture_output=True,
+                                text=True, check=True).stdout.splitlines()
+        timings.append(float(output[0]))
+        loaded = output[1] if len(output) > 1 else ""
+    print(f"Startup benchmark ({args.repeat} interpreters)")
+    print(f"  import     {min(timings):8.1f} ms (best), {sum(timings) / len(timings):.1f} ms (mean)")
+    print(f"  eager GUI/auth modules: {loaded or 'none'}")
+    return {'import_ms': min(timings), 'eager_modules': loaded}
+
+
+def parse_size(text):
+    multipliers = {'k': 1000, 'm': 1000000}
+    suffix = text[-1].lower()
+    if suffix in multipliers:
+        return int(float(text[:-1]) * multipliers[suffix])
+    return int(text)
+
+
+def write_synthetic_csv(path, rows, seed=2025):
+    # Deterministic cohort with the same columns as the real schedule, so runs compare across commits
+    rng = random.Random(seed)
+    first_names = ["Asha", "Rahul", "Priya", "Kiran", "Meera", "Arjun", "Divya", "Rakshith", "Jane", "Vikram"]
+    last_names = ["HR", "Smith", "Rao", "Kumar", "Iyer", "Shetty", "Nair", "Reddy", "Patel", "Gowda"]
+    courses = ["MCA", "Computer Science", "Electronics", "Mechanical", "Civil", "MBA"]
+    semesters = ["I", "II", "III", "IV", "V", "VI"]
+    subjects = ["Mathematics", "Physics", "Chemistry", "Biology", "English", "History",
+                "Data Structures", "Operating Systems", "Networks", "Economics"]
+    slots = ["09:00-12:00", "13:00-16:00", "09:00 AM -12:00 AM", "13:00 PM-16:00 PM"]
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(SCHEDULE_COLUMNS)
+        for i in range(rows):
+            row = [f"{rng.choice(first_names)} {rng.choice(last_names)}", f"SYN{i:08d}",
+                   rng.choice(courses), rng.choice(semesters)]
+            for day, subject in enumerate(rng.sample(subjects, 6), start=1):
+                row += [subject, f"{day:02d}-04-2025", rng.choice(slots)]
+            writer.writerow(row)
+
+
+def measure_stage(args):
+    # Runs one stage in this (fresh) interpreter and prints a JSON line for bench_suite
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = HallTicketGenerator(args.csv, output_dir)
+        limit = args.limit or None
+        start = time.perf_counter()
+        if args.stage == "read_csv_data":
+            count = len(generator.read_csv_data())
+        elif args.stage == "iter_csv_rows":
+            count = sum(1 for _ in generator.iter_csv_rows())
+        elif args.stage == "generate_qr_code":
+            count = sum(1 for _, row, _ in islice(generator.iter_csv_rows(), limit)
+                        if generator.generate_qr_code(row))
+        elif args.stage == "create_hall_ticket":
+            count = sum(1 for _, row, _ in islice(generator.iter_csv_rows(), limit)
+                        if generator.create_hall_ticket(row))
+        else:
+            count = len(generator.generate_all_hall_tickets())
+        seconds = time.perf_counter() - start
+    peak = generator.metrics.peak_memory_mb()
+    print(json.dumps({'stage': args.stage, 'count': count, 'seconds': seconds,
+                      'per_second': count / seconds if seconds else 0,
+                      'peak_rss_mb': peak['process'] if peak else None}))
+
+
+def bench_suite(args):
+    # Synthetic cohorts; every measurement runs in its own interpreter so peak RSS is per stage
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {}
+    print(f"{'rows':>9} {'stage':<26} {'items':>9} {'seconds':>9} {'items/s':>10} {'peak MB':>8}")
+    for size_text in args.sizes.split(","):
+        rows = parse_size(size_text)
+        csv_path = os.path.join(args.data_dir, f"synthetic_{rows}.csv")
+        if not os.path.exists(csv_path):
+            write_synthetic_csv(csv_path, rows)
+        stages = [("read_csv_data", 0), ("iter_csv_rows", 0),
+                  ("generate_qr_code", args.sample), ("create_hall_ticket", args.sample)]
+        if rows <= args.full_run_max:
+            stages.append(("generate_all_hall_tickets", 0))
+        for stage, limit in stages:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--csv", csv_path,
+                                     "measure", stage, "--limit", str(limit)],
+                                    capture_output=True, text=True, check=True).stdout.splitlines()
+            measurement = json.loads(output[-1])
+            results[f"{rows}/{stage}"] = measurement
+            peak = measurement['peak_rss_mb']
+            print(f"{rows:>9} {stage:<26} {measurement['count']:>9} {measurement['seconds']:>9.2f} "
+                  f"{measurement['per_second']:>10.1f} {peak if peak is None else round(peak, 1):>8}")
+    return results
+
+
+def record_history(path, command, results):
+    # Appends one JSON line per run so results can be compared across commits
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    entry = {'command': command, 'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+             'results': results}
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(entry) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hall ticket generator benchmarks")
+    parser.add_argument("--csv", default=SAMPLE_CSV, help="schedule CSV used as input")
+    parser.add_argument("--rows", type=int, default=50, help="number of students per pass")
+    parser.add_argument("--repeat", type=int, default=3, help="number of passes")
+    parser.add_argument("--history", help="append results as a JSON line to this file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("template", help="static template vs full redraw").set_defaults(func=bench_template)
+    subparsers.add_parser("qr", help="QR engine vs the original QRCode path").set_defaults(func=bench_qr)
+    subparsers.add_parser("encode", help="ticket image modes and file formats").set_defaults(func=bench_encode)
+    verify_parser = subparsers.add_parser("verify", help="gate-scan verification throughput")
+    verify_parser.add_argument("--tickets", type=int, default=20000, help="number of issued tickets")
+    verify_parser.add_argument("--threads", type=int, default=4, help="concurrent scanners")
+    verify_parser.set_defaults(func=bench_verify)
+    subparsers.add_parser("startup", help="import time of the ticket module").set_defaults(func=bench_startup)
+    suite_parser = subparsers.add_parser("suite", help="pipeline stages on synthetic cohorts")
+    suite_parser.add_argument("--sizes", default="1k,100k,1M", help="comma separated cohort sizes")
+    suite_parser.add_argument("--sample", type=int, default=200,
+                              help="rows used for the per-ticket stages (QR, create_hall_ticket)")
+    suite_parser.add_argument("--full-run-max", type=int, default=1000,
+                              help="largest cohort rendered end to end with generate_all_hall_tickets")
+    suite_parser.add_argument("--data-dir", default="bench_data", help="where synthetic CSVs are cached")
+    suite_parser.set_defaults(func=bench_suite)
+    measure_parser = subparsers.add_parser("measure", help=argparse.SUPPRESS)
+    measure_parser.add_argument("stage")
+    measure_parser.add_argument("--limit", type=int, default=0)
+    measure_parser.set_defaults(func=measure_stage)
+    args = parser.parse_args()
+    results = args.func(args)
+    if args.history and results is not None:
+        record_history(args.history, args.command, results)
+
+
+if __name__ == "__main__":
+    main()
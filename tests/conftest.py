@@ -0,0 +1,28 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "exam_schedule1 (1).csv")
+
+
+def read_sample(limit=None):
+    with open(SAMPLE_CSV, 'r', newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    return rows[:limit] if limit else rows
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def sample_rows():
+    return read_sample(6)
@@ -0,0 +1,94 @@
+import json
+import os
+
+from conftest import write_rows
+from ticket import HallTicketGenerator
+
+
+def manifest(output_dir):
+    with open(os.path.join(output_dir, 'hall_ticket_manifest.json'), 'r', encoding='utf-8') as file:
+        return json.load(file)['tickets']
+
+
+def test_incremental_rerun_keeps_tickets_of_invalid_rows(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    HallTicketGenerator(csv_path, output_dir, incremental=True).generate_all_hall_tickets()
+    before = manifest(output_dir)
+    assert len(before) == len(sample_rows)
+
+    changed, removed, invalid = sample_rows[0], sample_rows[1], sample_rows[2]
+    changed['Course'] = changed['Course'] + ' (revised)'
+    invalid['Date 1'] = '31-02-2025'
+    write_rows(csv_path, [row for row in sample_rows if row is not removed])
+    HallTicketGenerator(csv_path, output_dir, incremental=True).generate_all_hall_tickets()
+    after = manifest(output_dir)
+
+    assert after[changed['Roll Number']]['hash'] != before[changed['Roll Number']]['hash']
+    assert removed['Roll Number'] not in after
+    assert not os.path.exists(os.path.join(output_dir, before[removed['Roll Number']]['file']))
+    # Rejected by validation, but the student is still in the file: the old ticket stays
+    assert after[invalid['Roll Number']] == before[invalid['Roll Number']]
+    assert os.path.exists(os.path.join(output_dir, before[invalid['Roll Number']]['file']))
+    for roll in {row['Roll Number'] for row in sample_rows[3:]}:
+        assert after[roll] == before[roll]
+
+
+def test_finished_iteration_removes_checkpoint(tmp_path, sample_rows):
+    # The GUI drives iter_hall_tickets directly rather than generate_all_hall_tickets
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    generator = HallTicketGenerator(csv_path, output_dir, chunksize=2)
+    tickets = generator.iter_hall_tickets()
+    for _ in range(3):
+        next(tickets)
+    tickets.close()
+    assert os.path.exists(generator.checkpoint_path())
+
+    assert len(list(HallTicketGenerator(csv_path, output_dir).iter_hall_tickets())) == len(sample_rows)
+    assert not os.path.exists(generator.checkpoint_path())
+    resumed = HallTicketGenerator(csv_path, output_dir).generate_all_hall_tickets(resume=True)
+    assert len(resumed) == len(sample_rows)
+
+
+def test_unchanged_rerun_saves_manifest_once(tmp_path, sample_rows, monkeypatch):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    HallTicketGenerator(csv_path, output_dir, incremental=True, chunksize=2).generate_all_hall_tickets()
+    before = manifest(output_dir)
+
+    saves = []
+    original = HallTicketGenerator.save_manifest
+    monkeypatch.setattr(HallTicketGenerator, 'save_manifest',
+                        lambda self, tickets: saves.append(len(tickets)) or original(self, tickets))
+    HallTicketGenerator(csv_path, output_dir, incremental=True, chunksize=2).generate_all_hall_tickets()
+    # Three batches and nothing changed: only the end-of-run save, not one per batch
+    assert saves == [len(sample_rows)]
+    assert manifest(output_dir) == before
+
+
+def interrupted_run(csv_path, output_dir):
+    tickets = HallTicketGenerator(csv_path, output_dir, chunksize=2).iter_hall_tickets()
+    for _ in range(3):
+        next(tickets)
+    tickets.close()
+
+
+def test_resume_continues_from_checkpoint(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    interrupted_run(csv_path, output_dir)
+    resumed = HallTicketGenerator(csv_path, output_dir).generate_all_hall_tickets(resume=True)
+    assert len(resumed) == len(sample_rows) - 2
+
+
+def test_resume_ignores_checkpoint_of_edited_csv(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    interrupted_run(csv_path, output_dir)
+    # The saved byte offset would now land in the middle of a row
+    sample_rows[0]['Student Name'] += " Longer Name"
+    write_rows(csv_path, sample_rows)
+    generator = HallTicketGenerator(csv_path, output_dir)
+    assert generator.load_checkpoint() is None
+    assert len(generator.generate_all_hall_tickets(resume=True)) == len(sample_rows)
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from conftest import write_rows
+from ticket import HallTicketGenerator
+
+
+def pdf_pages(path):
+    # strict=True makes pypdf reject a broken xref table or object offsets
+    pypdf = pytest.importorskip("pypdf")
+    return pypdf.PdfReader(path, strict=True).pages
+
+
+def pdf_files(output_dir):
+    return sorted(name for name in os.listdir(output_dir) if name.endswith('.pdf'))
+
+
+def test_pdf_files_are_chunked_and_readable(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    tickets = HallTicketGenerator(csv_path, str(tmp_path / "out"), output_format="pdf",
+                                  tickets_per_file=4).generate_all_hall_tickets()
+    assert [os.path.basename(path) for path in tickets] == ["hall_tickets_0001.pdf", "hall_tickets_0002.pdf"]
+    assert [len(pdf_pages(path)) for path in tickets] == [4, 2]
+    xobject = pdf_pages(tickets[0])[0]['/Resources']['/XObject']
+    assert next(iter(xobject.values())).get_object()['/Subtype'] == '/Image'
+
+
+def test_sheets_place_several_tickets_per_page(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    tickets = HallTicketGenerator(csv_path, str(tmp_path / "out"), output_format="sheets",
+                                  n_up=4).generate_all_hall_tickets()
+    pages = pdf_pages(tickets[0])
+    assert len(pages) == 2
+    assert [len(page['/Resources']['/XObject']) for page in pages] == [4, 2]
+
+
+def test_resumed_pdf_run_continues_with_the_next_part(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    tickets = HallTicketGenerator(csv_path, output_dir, output_format="pdf", tickets_per_file=2,
+                                  chunksize=1).iter_hall_tickets()
+    for _ in range(3):
+        next(tickets)
+    # Stopped inside part 2: the checkpoint points just past the completed part 1
+    tickets.close()
+    generator = HallTicketGenerator(csv_path, output_dir, output_format="pdf", tickets_per_file=2)
+    assert generator.load_checkpoint()['part'] == 2
+    resumed = generator.generate_all_hall_tickets(resume=True)
+    assert [os.path.basename(path) for path in resumed] == ["hall_tickets_0002.pdf", "hall_tickets_0003.pdf"]
+    assert pdf_files(output_dir) == ["hall_tickets_0001.pdf", "hall_tickets_0002.pdf", "hall_tickets_0003.pdf"]
+    assert [len(pdf_pages(os.path.join(output_dir, name))) for name in pdf_files(output_dir)] == [2, 2, 2]
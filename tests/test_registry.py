@@ -0,0 +1,53 @@
+import os
+
+from conftest import write_rows
+from ticket import ISSUE_SERIAL_FIELD, HallTicketGenerator, TicketRegistry, TicketVerifier, main, signed_qr_payload
+
+SECRET = "test-secret"
+
+
+def generate(csv_path, output_dir, registry_path):
+    generator = HallTicketGenerator(csv_path, output_dir, qr_secret=SECRET, registry_path=registry_path)
+    return generator.generate_all_hall_tickets()
+
+
+def test_regeneration_keeps_revocation(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    registry_path = str(tmp_path / "registry.db")
+    student = sample_rows[0]
+    generate(csv_path, str(tmp_path / "out"), registry_path)
+    verifier = TicketVerifier(registry_path, SECRET)
+    payload = signed_qr_payload(SECRET, student)
+    assert verifier.verify(payload)[0] == "valid"
+
+    assert main(["revoke", student['Roll Number'], "--registry", registry_path]) == 0
+    generate(csv_path, str(tmp_path / "out"), registry_path)
+    assert TicketVerifier(registry_path, SECRET).verify(payload)[0] == "revoked"
+
+
+def test_reissue_invalidates_earlier_tickets(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    registry_path = str(tmp_path / "registry.db")
+    student = sample_rows[0]
+    generate(csv_path, str(tmp_path / "out"), registry_path)
+    old_payload = signed_qr_payload(SECRET, student)
+
+    assert TicketRegistry(registry_path).reissue(student['Roll Number']) == 2
+    generate(csv_path, str(tmp_path / "out"), registry_path)
+    new_payload = signed_qr_payload(SECRET, dict(student, **{ISSUE_SERIAL_FIELD: 2}))
+    verifier = TicketVerifier(registry_path, SECRET)
+    assert new_payload != old_payload
+    assert verifier.verify(old_payload)[0] == "revoked"
+    assert verifier.verify(new_payload)[0] == "valid"
+    assert verifier.verify(signed_qr_payload(SECRET, sample_rows[1]))[0] == "valid"
+    # The regenerated ticket was signed with the new serial
+    stored = verifier.connection().execute('SELECT signature FROM issued_tickets WHERE roll = ?',
+                                           (student['Roll Number'],)).fetchone()[0]
+    assert new_payload.endswith(":" + stored)
+
+
+def test_revoke_unknown_roll_fails(tmp_path):
+    registry_path = str(tmp_path / "registry.db")
+    TicketRegistry(registry_path)
+    assert main(["revoke", "NOPE", "--registry", registry_path]) == 1
+    assert os.path.exists(registry_path)
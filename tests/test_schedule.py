@@ -0,0 +1,51 @@
+import os
+from datetime import date, datetime
+
+from conftest import write_rows
+from ticket import HallTicketGenerator, ScheduleAnalyzer
+
+DAY = date(2025, 4, 1)
+
+
+def analyzer():
+    return ScheduleAnalyzer(lambda text: datetime.strptime(text, '%d-%m-%Y').date())
+
+
+def test_overlapping_pairs_ignores_back_to_back_exams():
+    morning = (DAY, 540, 720, "Mathematics")
+    afternoon = (DAY, 720, 900, "Physics")
+    overlapping = (DAY, 600, 780, "Chemistry")
+    next_day = (date(2025, 4, 2), 600, 780, "Biology")
+    assert ScheduleAnalyzer.overlapping_pairs([morning, afternoon, next_day]) == []
+    assert ScheduleAnalyzer.overlapping_pairs([afternoon, overlapping, morning]) == [
+        (morning, overlapping), (overlapping, afternoon)]
+
+
+def test_parse_time_range_handles_sample_formats():
+    schedule = analyzer()
+    # "12:00 AM" in the sample means noon, and 24h hours may carry a redundant PM
+    assert schedule.parse_time_range("09:00 AM -12:00 AM") == (540, 720)
+    assert schedule.parse_time_range("13:00 PM-16:00 PM") == (780, 960)
+    assert schedule.parse_time_range("09:00-12:00") == (540, 720)
+    assert schedule.parse_time_range("02:00 PM - 05:00 PM") == (840, 1020)
+    assert schedule.parse_time_range("16:00-13:00") is None
+    assert schedule.parse_time_range("TBA") is None
+
+
+def test_peak_concurrency_counts_adjoining_slots_separately():
+    schedule = analyzer()
+    schedule.slots = {(DAY, 540, 720): 3, (DAY, 720, 900): 2, (DAY, 600, 660): 1}
+    # The 12:00 hand-over has three students leaving and two arriving, never five at once
+    assert schedule.peak_concurrency() == {"2025-04-01": 4}
+
+
+def test_strict_clash_check_refuses_to_generate(tmp_path, sample_rows):
+    sample_rows[3]['Date 2'] = sample_rows[3]['Date 1']
+    sample_rows[3]['Time 2'] = "10:00-13:00"
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    generator = HallTicketGenerator(csv_path, output_dir, clash_check="strict")
+    assert generator.generate_all_hall_tickets() == []
+    assert generator.schedule_report.overlap_count == 1
+    assert os.path.exists(generator.schedule_report_path())
+    assert not [name for name in os.listdir(output_dir) if name.endswith('.png')]
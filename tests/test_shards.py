@@ -0,0 +1,53 @@
+import json
+import os
+
+from conftest import write_rows
+from ticket import ShardPlan
+
+
+def planned_run(tmp_path, rows, shards=2):
+    csv_path = write_rows(tmp_path / "schedule.csv", rows)
+    plan = ShardPlan.create(str(tmp_path / "jobs"), shards, "hash", csv_path=csv_path)
+    for index in range(shards):
+        assert plan.run(index)
+    return plan
+
+
+def shard_manifest(plan, index):
+    return os.path.join(plan.shard_dir(index), 'hall_ticket_manifest.json')
+
+
+def test_merge_combines_every_shard(tmp_path, sample_rows):
+    plan = planned_run(tmp_path, sample_rows)
+    report = plan.merge(str(tmp_path / "merged"))
+    assert report['ok']
+    assert report['tickets'] == len(sample_rows)
+
+
+def test_merge_detects_corrupt_file_and_dropped_manifest_entry(tmp_path, sample_rows):
+    plan = planned_run(tmp_path, sample_rows)
+    with open(shard_manifest(plan, 0), 'r', encoding='utf-8') as file:
+        first = json.load(file)
+    with open(shard_manifest(plan, 1), 'r', encoding='utf-8') as file:
+        second = json.load(file)
+    assert first['tickets'] and second['tickets']
+
+    # Same size, one byte different
+    corrupt_roll, entry = sorted(first['tickets'].items())[0]
+    corrupt_path = os.path.join(plan.shard_dir(0), entry['file'])
+    with open(corrupt_path, 'r+b') as file:
+        file.seek(-1, os.SEEK_END)
+        last = file.read(1)
+        file.seek(-1, os.SEEK_END)
+        file.write(bytes([last[0] ^ 0xFF]))
+    dropped_roll = sorted(second['tickets'])[0]
+    del second['tickets'][dropped_roll]
+    with open(shard_manifest(plan, 1), 'w', encoding='utf-8') as file:
+        json.dump(second, file)
+
+    report = plan.merge(str(tmp_path / "merged"))
+    issues = {(problem['shard'], problem.get('roll'), problem['issue']) for problem in report['problems']}
+    assert not report['ok']
+    assert (0, corrupt_roll, 'hash_mismatch') in issues
+    assert (1, None, 'count_mismatch') in issues
+    assert report['tickets'] == len(sample_rows) - 2
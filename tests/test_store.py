@@ -0,0 +1,24 @@
+from conftest import write_rows
+from ticket import StudentStore, main
+
+
+def test_import_reports_blank_and_duplicate_rolls(tmp_path, sample_rows):
+    first, second = sample_rows[0], sample_rows[1]
+    rows = [dict(first, **{'Roll Number': ''}), dict(second, **{'Roll Number': '  '}),
+            dict(first, **{'Roll Number': 'R1'}), dict(second, **{'Roll Number': 'R1'})]
+    csv_path = write_rows(tmp_path / "schedule.csv", rows)
+    store = StudentStore(str(tmp_path / "students.db"))
+    summary = store.import_csv(csv_path)
+    assert summary == {'rows': 4, 'stored': 1, 'blank_roll': 2, 'duplicate_in_file': 1, 'replaced': 0}
+    assert store.count() == 1
+    # The last row for a repeated roll wins
+    assert [row['Student Name'] for _, row in store.iter_students()] == [second['Student Name']]
+
+
+def test_reimport_counts_replaced_rolls(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    store_path = str(tmp_path / "students.db")
+    assert main(["import", csv_path, "--db", store_path]) == 0
+    summary = StudentStore(store_path).import_csv(csv_path)
+    assert summary['stored'] == summary['replaced'] == len(sample_rows)
+    assert StudentStore(store_path).count() == len(sample_rows)
@@ -0,0 +1,66 @@
+import json
+import os
+
+from conftest import write_rows
+from ticket import HallTicketGenerator, ValidationReport
+
+
+def ticket_files(output_dir):
+    return sorted(name for name in os.listdir(output_dir) if name.endswith('.png'))
+
+
+def issue_codes(report):
+    return {(issue['row'], issue['code']) for issue in report.issues}
+
+
+def test_streamed_validation_rejects_bad_rows(tmp_path, sample_rows):
+    sample_rows[1]['Student Name'] = "  "
+    sample_rows[2]['Roll Number'] = " " + sample_rows[2]['Roll Number']
+    sample_rows[3]['Roll Number'] = "P19/MT24"
+    sample_rows[4]['Date 1'] = "2025-04-01"
+    # chunksize=2 puts the duplicate in a later chunk than the first use of the roll
+    sample_rows[5]['Roll Number'] = sample_rows[0]['Roll Number']
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    generator = HallTicketGenerator(csv_path, output_dir, chunksize=2)
+    tickets = generator.generate_all_hall_tickets()
+
+    report = generator.validation_report
+    assert issue_codes(report) == {(1, 'empty_field'), (2, 'unsafe_filename'), (3, 'unsafe_filename'),
+                                   (4, 'malformed_date'), (5, 'duplicate_roll')}
+    assert report.invalid_rows == {1, 2, 3, 4, 5}
+    assert len(tickets) == 1
+    assert ticket_files(output_dir) == [f"{sample_rows[0]['Roll Number']}_hall_ticket.png"]
+    with open(generator.validation_report_path(), 'r', encoding='utf-8') as file:
+        assert json.load(file)['invalid_rows'] == 5
+
+
+def test_roll_with_surrounding_whitespace_is_unsafe(tmp_path, sample_rows):
+    generator = HallTicketGenerator(str(tmp_path / "unused.csv"), str(tmp_path / "out"))
+    report = ValidationReport()
+    for row_number, roll in enumerate(["R1 ", " R2", "R3"]):
+        generator.validate_row(report, row_number, dict(sample_rows[0], **{'Roll Number': roll}))
+    assert issue_codes(report) == {(0, 'unsafe_filename'), (1, 'unsafe_filename')}
+    assert report.invalid_rows == {0, 1}
+
+
+def test_missing_column_rejects_every_row(tmp_path, sample_rows):
+    for row in sample_rows:
+        del row['Course']
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    generator = HallTicketGenerator(csv_path, str(tmp_path / "out"))
+    report = generator.validate_csv()
+    assert report.counts['missing_column'] == 1
+    assert len(report.invalid_rows) == len(sample_rows)
+    assert not report.ok
+
+
+def test_strict_validation_writes_nothing(tmp_path, sample_rows):
+    sample_rows[4]['Date 2'] = "31-02-2025"
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    generator = HallTicketGenerator(csv_path, output_dir, validation="strict")
+    assert generator.generate_all_hall_tickets() == []
+    assert issue_codes(generator.validation_report) == {(4, 'malformed_date')}
+    assert ticket_files(output_dir) == []
+    assert os.path.exists(generator.validation_report_path())
@@ -0,0 +1,41 @@
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from conftest import write_rows
+from ticket import HallTicketGenerator, QREngine, VectorCanvas
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_merged_rectangles_cover_qr_matrix_exactly():
+    matrix = QREngine().encode("HT1:P19MT24S126004:ABCDEFGHIJKLMNOP")
+    rectangles = VectorCanvas.merged_rectangles(matrix)
+    covered = []
+    for column, row, width, height in rectangles:
+        covered.extend((row + dy, column + dx) for dy in range(height) for dx in range(width))
+    dark = [(row, column) for row, line in enumerate(matrix) for column, module in enumerate(line) if module]
+    # Every dark module exactly once and nothing else, so no module is painted twice
+    assert sorted(covered) == sorted(dark)
+    assert len(rectangles) < len(dark)
+
+
+def test_svg_ticket_is_well_formed(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows[:1])
+    tickets = HallTicketGenerator(csv_path, str(tmp_path / "out"), output_format="svg").generate_all_hall_tickets()
+    root = ElementTree.parse(tickets[0]).getroot()
+    assert root.tag == f"{SVG}svg"
+    assert sample_rows[0]['Student Name'] in [element.text for element in root.iter(f"{SVG}text")]
+    assert root.find(f"{SVG}path[@shape-rendering='crispEdges']") is not None
+
+
+def test_vector_pdf_is_readable(tmp_path, sample_rows):
+    pypdf = pytest.importorskip("pypdf")
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows[:2])
+    tickets = HallTicketGenerator(csv_path, str(tmp_path / "out"), output_format="pdf",
+                                  backend="vector").generate_all_hall_tickets()
+    pages = pypdf.PdfReader(tickets[0], strict=True).pages
+    assert len(pages) == 2
+    xobject = pages[0]['/Resources']['/XObject']
+    assert next(iter(xobject.values())).get_object()['/Subtype'] == '/Form'
+    assert sample_rows[0]['Student Name'] in pages[0].extract_text()
@@ -0,0 +1,27 @@
+import json
+import os
+
+from conftest import write_rows
+from ticket import HallTicketGenerator
+
+
+def test_failed_background_write_counts_as_failed(tmp_path, sample_rows):
+    csv_path = write_rows(tmp_path / "schedule.csv", sample_rows)
+    output_dir = str(tmp_path / "out")
+    generator = HallTicketGenerator(csv_path, output_dir, writer_threads=2, incremental=True)
+    broken_roll = sample_rows[2]['Roll Number']
+    save_image = generator.save_image
+
+    def failing_save(image, save_path, roll=None):
+        if roll == broken_roll:
+            raise OSError("disk full")
+        save_image(image, save_path, roll)
+
+    generator.save_image = failing_save
+    results = list(generator.iter_hall_tickets())
+    assert [path for _, path in results].count(None) == 1
+    assert results[2][1] is None
+    assert generator.metrics.tickets == len(sample_rows) - 1
+    assert generator.metrics.failed == 1
+    with open(os.path.join(output_dir, 'hall_ticket_manifest.json'), 'r', encoding='utf-8') as file:
+        assert broken_roll not in json.load(file)['tickets']
@@ -1,492 +1,2829 @@
-import csv
-import qrcode
-import json
-from PIL import Image, ImageDraw, ImageFont
-import os
-import sqlite3
-import logging
-from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-from tkinter import Tk, Label, Entry, Button, StringVar, filedialog, messagebox, Toplevel, Listbox
-
-# Initialize SQLite database
-def init_db():
-    conn = sqlite3.connect('database.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT)''')
-    conn.commit()
-    conn.close()
-
-# HallTicketGenerator class with improved QR code positioning
-class HallTicketGenerator:
-    def __init__(self, csv_path, output_dir, college_name="COLLEGE NAME"):
-        self.csv_path = csv_path
-        self.output_dir = output_dir
-        self.college_name = college_name
-        
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        try:
-            self.title_font = ImageFont.truetype("arial.ttf", 18)
-            self.header_font = ImageFont.truetype("arialbd.ttf", 14)
-            self.normal_font = ImageFont.truetype("arial.ttf", 12)
-            self.small_font = ImageFont.truetype("arial.ttf", 10)
-        except IOError:
-            # Provide better fallback for font loading failures
-            logging.warning("Could not load specified fonts, using default fonts")
-            self.title_font = ImageFont.load_default()
-            self.header_font = ImageFont.load_default()
-            self.normal_font = ImageFont.load_default()
-            self.small_font = ImageFont.load_default()
-        
-        self.width = 1000
-        self.height = 750
-        self.table_start_x = 50
-        self.table_start_y = 200
-        self.table_width = 800  # Reduced width to make room for QR code
-        self.row_height = 50
-        self.num_rows = 7
-
-        logging.basicConfig(filename=os.path.join(output_dir, 'hall_ticket_generator.log'), 
-                            level=logging.INFO, 
-                            format='%(asctime)s - %(levelname)s - %(message)s')
-        logging.info(f"HallTicketGenerator initialized at {datetime.now()}")
-
-    def read_csv_data(self):
-        students = []
-        try:
-            with open(self.csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    students.append(row)
-            logging.info(f"CSV data read successfully with {len(students)} records")
-            return students
-        except Exception as e:
-            logging.error(f"Error reading CSV file: {e}")
-            return []
-    
-    def generate_qr_code(self, student_data):
-        try:
-            # Only include necessary data in QR code to reduce size
-            qr_data = {
-                'name': student_data['Student Name'],
-                'roll': student_data['Roll Number'],
-                'course': student_data['Course'],
-                'semester': student_data['Semester']
-            }
-            data_json = json.dumps(qr_data)
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=8,
-                border=4,
-            )
-            qr.add_data(data_json)
-            qr.make(fit=True)
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            logging.info(f"QR code generated successfully for {student_data['Roll Number']}")
-            return qr_img
-        except Exception as e:
-            logging.error(f"Error generating QR code: {e}")
-            return None
-    
-    def draw_line(self, draw, start_pos, end_pos, width=1):
-        draw.line([start_pos, end_pos], fill="black", width=width)
-    
-    def draw_rectangle(self, draw, top_left, bottom_right, outline="black", width=1):
-        draw.rectangle([top_left, bottom_right], outline=outline, width=width)
-    
-    def draw_text(self, draw, position, text, font, fill="black", anchor="lt"):
-        draw.text(position, text, font=font, fill=fill, anchor=anchor)
-    
-    def draw_table(self, draw):
-        table_end_x = self.table_start_x + self.table_width
-        table_end_y = self.table_start_y + self.row_height * self.num_rows
-        self.draw_rectangle(draw, (self.table_start_x, self.table_start_y), 
-                           (table_end_x, table_end_y), width=2)
-        
-        for i in range(1, self.num_rows):
-            y = self.table_start_y + i * self.row_height
-            self.draw_line(draw, (self.table_start_x, y), 
-                          (table_end_x, y), width=1)
-        
-        sno_width = 50
-        subject_width = 200
-        date_width = 150
-        time_width = 150
-        signature_width = 250  # Adjusted to fit within reduced table width
-        
-        x = self.table_start_x + sno_width
-        self.draw_line(draw, (x, self.table_start_y), 
-                      (x, table_end_y), width=1)
-        
-        x += subject_width
-        self.draw_line(draw, (x, self.table_start_y), 
-                      (x, table_end_y), width=1)
-        
-        x += date_width
-        self.draw_line(draw, (x, self.table_start_y), 
-                      (x, table_end_y), width=1)
-        
-        x += time_width
-        self.draw_line(draw, (x, self.table_start_y), 
-                      (x, table_end_y), width=1)
-        
-        header_y = self.table_start_y + self.row_height / 2
-        self.draw_text(draw, (self.table_start_x + sno_width / 2, header_y), 
-                      "S.No", self.header_font, anchor="mm")
-        self.draw_text(draw, (self.table_start_x + sno_width + subject_width / 2, header_y), 
-                      "Subject Name", self.header_font, anchor="mm")
-        self.draw_text(draw, (self.table_start_x + sno_width + subject_width + date_width / 2, header_y), 
-                      "Date", self.header_font, anchor="mm")
-        self.draw_text(draw, (self.table_start_x + sno_width + subject_width + date_width + time_width / 2, header_y), 
-                      "Time", self.header_font, anchor="mm")
-        self.draw_text(draw, (self.table_start_x + sno_width + subject_width + date_width + time_width + signature_width / 2, header_y), 
-                      "Invigilator Signature", self.header_font, anchor="mm")
-        
-        return {
-            'sno_width': sno_width,
-            'subject_width': subject_width,
-            'date_width': date_width,
-            'time_width': time_width,
-            'signature_width': signature_width
-        }
-    
-    def create_hall_ticket(self, student_data):
-        try:
-            image = Image.new('RGB', (self.width, self.height), color='white')
-            draw = ImageDraw.Draw(image)
-            
-            self.draw_text(draw, (self.width / 2, 40), self.college_name, 
-                          self.title_font, anchor="mm")
-            self.draw_text(draw, (self.width / 2, 70), "EXAMINATION HALL TICKET", 
-                          self.header_font, anchor="mm")
-            
-            # Check if required keys exist in student_data
-            required_keys = ['Student Name', 'Roll Number', 'Course', 'Semester']
-            for key in required_keys:
-                if key not in student_data or not student_data[key]:
-                    logging.error(f"Missing required data: {key} for student {student_data.get('Roll Number', 'Unknown')}")
-                    return None
-            
-            # Student information section - adjusted to leave space for QR code
-            self.draw_text(draw, (60, 110), "Student Name:", self.header_font)
-            self.draw_text(draw, (60, 140), "Roll Number:", self.header_font)
-            self.draw_text(draw, (60, 170), "Course:", self.header_font)
-            self.draw_text(draw, (400, 110), "Semester:", self.header_font)
-            
-            self.draw_text(draw, (200, 110), student_data['Student Name'], self.normal_font)
-            self.draw_text(draw, (200, 140), student_data['Roll Number'], self.normal_font)
-            self.draw_text(draw, (200, 170), student_data['Course'], self.normal_font)
-            self.draw_text(draw, (480, 110), student_data['Semester'], self.normal_font)
-            
-            # Draw QR code in proper position before drawing the table
-            qr_img = self.generate_qr_code(student_data)
-            if qr_img:
-                qr_size = 120
-                qr_img = qr_img.resize((qr_size, qr_size))
-                # Position QR code in top right corner with proper padding
-                qr_position = (self.width - qr_size - 60, 50)
-                image.paste(qr_img, qr_position)
-            
-            table_dims = self.draw_table(draw)
-            
-            for i in range(1, 7):
-                subject_key = f"Subject {i}"
-                date_key = f"Date {i}"
-                time_key = f"Time {i}"
-                
-                if subject_key in student_data and student_data[subject_key]:
-                    row_y = self.table_start_y + (i) * self.row_height + self.row_height / 2
-                    self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] / 2, row_y), 
-                                  str(i), self.normal_font, anchor="mm")
-                    self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] + table_dims['subject_width'] / 2, row_y), 
-                                  student_data[subject_key], self.normal_font, anchor="mm")
-                    date_text = student_data.get(date_key, "DD/MM/YYYY")
-                    self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] + table_dims['subject_width'] + 
-                                        table_dims['date_width'] / 2, row_y), 
-                                  date_text, self.normal_font, anchor="mm")
-                    time_text = student_data.get(time_key, "HH:MM - HH:MM")
-                    self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] + table_dims['subject_width'] + 
-                                        table_dims['date_width'] + table_dims['time_width'] / 2, row_y), 
-                                  time_text, self.normal_font, anchor="mm")
-            
-            instructions_y = self.table_start_y + self.row_height * self.num_rows + 30
-            self.draw_text(draw, (60, instructions_y), "Instructions:", self.header_font)
-            
-            instructions = [
-                "1. Students must bring this hall ticket for every exam.",
-                "2. Latecomers will not be allowed to enter the exam hall.",
-                "3. Use of electronic gadgets is strictly prohibited.",
-                "4. Follow all exam guidelines as instructed by the invigilator."
-            ]
-            
-            for i, instruction in enumerate(instructions):
-                self.draw_text(draw, (60, instructions_y + 25 + i * 20), instruction, self.normal_font)
-            
-            sig_y = instructions_y + 25 + len(instructions) * 20 + 30
-            self.draw_text(draw, (60, sig_y), "Principal's Signature:", self.normal_font)
-            self.draw_line(draw, (200, sig_y + 10), (350, sig_y + 10))
-            self.draw_text(draw, (500, sig_y), "Student's Signature:", self.normal_font)
-            self.draw_line(draw, (640, sig_y + 10), (790, sig_y + 10))
-            
-            filename = f"{student_data['Roll Number']}_hall_ticket.png"
-            save_path = os.path.join(self.output_dir, filename)
-            image.save(save_path)
-            logging.info(f"Hall ticket created for {student_data['Student Name']} ({student_data['Roll Number']})")
-            return save_path
-        except Exception as e:
-            logging.error(f"Error creating hall ticket: {e}")
-            return None
-    
-    def generate_all_hall_tickets(self):
-        students = self.read_csv_data()
-        if not students:
-            logging.error("No student data found or error reading CSV")
-            return []
-            
-        generated_tickets = []
-        
-        for student in students:
-            ticket_path = self.create_hall_ticket(student)
-            if ticket_path:
-                generated_tickets.append(ticket_path)
-        
-        logging.info(f"Generated {len(generated_tickets)} hall tickets out of {len(students)} students")
-        return generated_tickets
-
-class Application:
-    def __init__(self):
-        self.root = Tk()
-        self.root.title("Hall Ticket Generator")
-        self.root.geometry("400x300")
-        self.username = StringVar()
-        self.password = StringVar()
-        self.init_db()
-        self.create_widgets()
-
-    def init_db(self):
-        init_db()
-
-    def create_widgets(self):
-        Label(self.root, text="Hall Ticket Generator", font=("Arial", 16)).pack(pady=10)
-        Label(self.root, text="Username").pack(pady=5)
-        Entry(self.root, textvariable=self.username).pack(pady=5)
-        Label(self.root, text="Password").pack(pady=5)
-        Entry(self.root, textvariable=self.password, show="*").pack(pady=5)
-        
-        # Add button frame for better layout
-        button_frame = Label(self.root)
-        button_frame.pack(pady=5)
-        Button(button_frame, text="Login", command=self.login).pack(side="left", padx=5)
-        Button(button_frame, text="Clear", command=self.clear_login_fields).pack(side="left", padx=5)
-        Button(button_frame, text="Register", command=self.open_register_form).pack(side="left", padx=5)
-
-    def clear_login_fields(self):
-        self.username.set("")
-        self.password.set("")
-
-    def open_register_form(self):
-        register_win = Toplevel(self.root)
-        register_win.title("Register")
-        register_win.geometry("300x200")
-        
-        username = StringVar()
-        password = StringVar()
-        
-        Label(register_win, text="Create Username").pack(pady=5)
-        Entry(register_win, textvariable=username).pack(pady=5)
-        Label(register_win, text="Create Password").pack(pady=5)
-        Entry(register_win, textvariable=password, show="*").pack(pady=5)
-        
-        # Add button frame with Clear option
-        button_frame = Label(register_win)
-        button_frame.pack(pady=10)
-        Button(button_frame, text="Register", command=lambda: self.register(username, password, register_win)).pack(side="left", padx=5)
-        Button(button_frame, text="Clear", command=lambda: self.clear_register_fields(username, password)).pack(side="left", padx=5)
-
-    def clear_register_fields(self, username, password):
-        username.set("")
-        password.set("")
-
-    def register(self, username, password, window):
-        if username.get() and password.get():
-            try:
-                # Fix: Changed the hash method to 'pbkdf2:sha256' which is supported by werkzeug
-                hashed_password = generate_password_hash(password.get())
-            
-                conn = sqlite3.connect('database.db')
-                c = conn.cursor()
-                c.execute('INSERT INTO users (username, password) VALUES (?, ?)', (username.get(), hashed_password))
-                conn.commit()
-                conn.close()
-                
-                messagebox.showinfo("Registration", "User registered successfully!")
-                window.destroy()
-            except sqlite3.IntegrityError:
-                messagebox.showerror("Registration", "Username already exists. Please choose another.")
-            except Exception as e:
-                messagebox.showerror("Registration Error", f"An error occurred: {str(e)}")
-        else:
-            messagebox.showerror("Registration", "Please enter both username and password")
-
-    def login(self):
-        username = self.username.get()
-        password = self.password.get()
-        
-        if not username or not password:
-            messagebox.showerror("Login", "Please enter both username and password")
-            return
-            
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute('SELECT * FROM users WHERE username = ?', (username,))
-            user = c.fetchone()
-            conn.close()
-            
-            if user and check_password_hash(user[2], password):
-                messagebox.showinfo("Login", "Login successful!")
-                self.root.withdraw()  # Hide the login window
-                self.upload_window()
-            else:
-                messagebox.showerror("Login", "Invalid username or password")
-        except Exception as e:
-            messagebox.showerror("Login Error", f"An error occurred: {str(e)}")
-
-    def upload_window(self):
-        upload_win = Toplevel(self.root)
-        upload_win.title("Hall Ticket Generator")
-        upload_win.geometry("500x400")
-        upload_win.protocol("WM_DELETE_WINDOW", self.close_application)
-        
-        Label(upload_win, text="Generate Hall Tickets", font=("Arial", 16)).pack(pady=10)
-        
-        frame = Label(upload_win)
-        frame.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        self.college_name_var = StringVar(value="East Point College")
-        Label(frame, text="College Name:").pack(anchor="w", pady=5)
-        Entry(frame, textvariable=self.college_name_var, width=40).pack(anchor="w", pady=5)
-        
-        self.output_dir_var = StringVar(value="output")
-        Label(frame, text="Output Directory:").pack(anchor="w", pady=5)
-        dir_frame = Label(frame)
-        dir_frame.pack(fill="x", pady=5)
-        Entry(dir_frame, textvariable=self.output_dir_var, width=30).pack(side="left")
-        Button(dir_frame, text="Browse", command=self.browse_output_dir).pack(side="left", padx=5)
-        
-        # Add button frame with Clear option
-        button_frame = Label(frame)
-        button_frame.pack(pady=10)
-        Button(button_frame, text="Upload CSV & Generate Tickets", command=self.upload_csv).pack(side="left", padx=5)
-        Button(button_frame, text="Clear Form", command=self.clear_upload_form).pack(side="left", padx=5)
-        
-        list_frame = Label(upload_win)
-        list_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        Label(list_frame, text="Generated Hall Tickets:").pack(anchor="w")
-        self.hall_ticket_list = Listbox(list_frame, width=50, height=10)
-        self.hall_ticket_list.pack(fill="both", expand=True, pady=5)
-        
-        # Add button frame for ticket operations
-        ticket_button_frame = Label(list_frame)
-        ticket_button_frame.pack(pady=5)
-        Button(ticket_button_frame, text="Open Selected Ticket", command=self.open_selected_ticket).pack(side="left", padx=5)
-        Button(ticket_button_frame, text="Clear All Tickets", command=self.clear_all_tickets).pack(side="left", padx=5)
-    
-    def browse_output_dir(self):
-        directory = filedialog.askdirectory()
-        if directory:
-            self.output_dir_var.set(directory)
-    
-    def clear_upload_form(self):
-        self.college_name_var.set("East Point College")  # Reset to default
-        self.output_dir_var.set("output")  # Reset to default
-        self.hall_ticket_list.delete(0, "end")  # Clear the listbox
-        messagebox.showinfo("Clear", "Form has been cleared")
-    
-    def clear_all_tickets(self):
-        if messagebox.askyesno("Confirm", "Are you sure you want to delete all generated hall tickets?"):
-            output_dir = self.output_dir_var.get()
-            if os.path.exists(output_dir):
-                try:
-                    # Delete only PNG files (hall tickets) in the directory
-                    deleted_count = 0
-                    for file in os.listdir(output_dir):
-                        if file.endswith("_hall_ticket.png"):
-                            os.remove(os.path.join(output_dir, file))
-                            deleted_count += 1
-                    
-                    # Clear the listbox
-                    self.hall_ticket_list.delete(0, "end")
-                    messagebox.showinfo("Success", f"{deleted_count} hall tickets have been deleted")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to delete tickets: {str(e)}")
-            else:
-                messagebox.showinfo("Info", "Output directory does not exist")
-    
-    def open_selected_ticket(self):
-        selection = self.hall_ticket_list.curselection()
-        if selection:
-            ticket_name = self.hall_ticket_list.get(selection[0])
-            output_dir = self.output_dir_var.get()
-            ticket_path = os.path.join(output_dir, ticket_name)
-            
-            if os.path.exists(ticket_path):
-                try:
-                    # Platform independent way to open files
-                    import subprocess
-                    import sys
-                    
-                    if sys.platform == 'win32':
-                        os.startfile(ticket_path)
-                    elif sys.platform == 'darwin':  # macOS
-                        subprocess.run(['open', ticket_path], check=True)
-                    else:  # Linux
-                        subprocess.run(['xdg-open', ticket_path], check=True)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to open file: {str(e)}")
-            else:
-                messagebox.showerror("Error", "File not found")
-    
-    def upload_csv(self):
-        csv_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
-        if not csv_path:
-            return
-            
-        output_dir = self.output_dir_var.get()
-        college_name = self.college_name_var.get()
-        
-        # Clear the listbox
-        self.hall_ticket_list.delete(0, "end")
-        
-        try:
-            # Create output directory if it doesn't exist
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-                
-            generator = HallTicketGenerator(csv_path, output_dir, college_name)
-            tickets = generator.generate_all_hall_tickets()
-            
-            if tickets:
-                for ticket_path in tickets:
-                    self.hall_ticket_list.insert("end", os.path.basename(ticket_path))
-                
-                messagebox.showinfo("Success", f"{len(tickets)} hall tickets generated in {output_dir}")
-            else:
-                messagebox.showwarning("Warning", "No hall tickets were generated. Check the log file for details.")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-    
-    def close_application(self):
-        self.root.destroy()
-    
-    def run(self):
-        self.root.mainloop()
-
-
-if __name__ == "__main__":
-    app = Application()
-    app.run()
\ No newline at end of file
+import csv
+import json
+import hashlib
+import hmac
+import base64
+import threading
+import queue
+import atexit
+import zlib
+import re
+import io
+from PIL import Image, ImageDraw, ImageFont
+import os
+import logging
+import logging.handlers
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# GUI, auth, database and QR libraries are imported where they are used so that
+# headless batch runs start quickly and never load tkinter
+def _import_gui():
+    global Tk, Label, Entry, Button, StringVar, filedialog, messagebox, Toplevel, Listbox, ttk
+    from tkinter import Tk, Label, Entry, Button, StringVar, filedialog, messagebox, Toplevel, Listbox, ttk
+
+# Log records are queued by the caller and written to disk by a listener thread,
+# so rendering never blocks on log I/O. Like basicConfig, an already configured
+# root logger is left alone.
+_log_listener = None
+
+def setup_logging(log_path):
+    global _log_listener
+    root = logging.getLogger()
+    if _log_listener is not None or root.handlers:
+        return
+    file_handler = logging.FileHandler(log_path)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    log_queue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+# Latency histogram with power-of-two microsecond buckets, cheap enough to update per ticket
+class StageHistogram:
+    BUCKETS = 32
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * self.BUCKETS
+    
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[min(int(seconds * 1e6).bit_length(), self.BUCKETS - 1)] += 1
+    
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the requested rank, in milliseconds
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                return min((2 ** index) / 1000, self.max * 1000)
+        return self.max * 1000
+    
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0,
+            'min_ms': (self.min or 0) * 1000,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max * 1000
+        }
+
+# Per-run stage timings. Worker processes hand their samples back with each ticket
+# through take_samples/add_samples so the parent holds the whole picture.
+class RunMetrics:
+    def __init__(self, collect_samples=False):
+        self.stages = {}
+        self.collect_samples = collect_samples
+        self.samples = []
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.tickets = 0
+        self.failed = 0
+        # Additional sections for the JSON summary, e.g. cache statistics
+        self.extra = {}
+    
+    def record(self, stage, seconds):
+        # Background writer threads record too
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = StageHistogram()
+            histogram.add(seconds)
+            if self.collect_samples:
+                self.samples.append((stage, seconds))
+    
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+    
+    def take_samples(self):
+        samples, self.samples = self.samples, []
+        return samples
+    
+    def add_samples(self, samples):
+        for stage, seconds in samples:
+            self.record(stage, seconds)
+    
+    def peak_memory_mb(self):
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return {'process': own / scale, 'largest_worker': children / scale}
+    
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'elapsed_s': elapsed,
+            'tickets': self.tickets,
+            'failed': self.failed,
+            'tickets_per_second': self.tickets / elapsed if elapsed else 0,
+            'peak_memory_mb': self.peak_memory_mb(),
+            'stages': {stage: histogram.summary() for stage, histogram in self.stages.items()},
+            **self.extra
+        }
+    
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.summary(), file, indent=2)
+
+# Initialize SQLite database
+def init_db():
+    import sqlite3
+    conn = sqlite3.connect('database.db')
+    c = conn.cursor()
+    c.execute('''CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password TEXT)''')
+    conn.commit()
+    conn.close()
+
+# Per-process generator used by the parallel rendering pool. Each worker builds
+# it once in the pool initializer so fonts are loaded a single time per process.
+_worker_generator = None
+
+def _init_worker(config):
+    global _worker_generator, _log_listener
+    if _log_listener is not None:
+        # A forked worker inherits the parent's queue handler but not its listener thread
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        _log_listener = None
+    setup_logging(os.path.join(config['output_dir'], 'hall_ticket_generator.log'))
+    if _log_listener is not None:
+        # Pool workers leave through multiprocessing's exit path, which skips atexit
+        from multiprocessing.util import Finalize
+        Finalize(_log_listener, _log_listener.stop, exitpriority=10)
+    _worker_generator = HallTicketGenerator(**config)
+    _worker_generator.metrics = RunMetrics(collect_samples=True)
+
+def _render_in_worker(student_data):
+    result = _worker_generator.create_hall_ticket(student_data)
+    return result, _worker_generator.metrics.take_samples(), _worker_generator.take_index_records()
+
+def _encode_in_worker(student_data):
+    result = _worker_generator.encode_hall_ticket(student_data)
+    return result, _worker_generator.metrics.take_samples(), None
+
+# QR encoder that keeps one symbol version and mask for the whole run and rasterizes
+# the module matrix straight to the final ticket size. Payloads carry the roll number,
+# so each one is encoded exactly once per run and there is nothing worth caching.
+class QREngine:
+    def __init__(self, size=120, border=4, error_correction=None, mask_pattern=0):
+        import qrcode
+        self.size = size
+        self.border = border
+        self.error_correction = qrcode.constants.ERROR_CORRECT_L if error_correction is None else error_correction
+        self.mask_pattern = mask_pattern
+        self.version = None
+    
+    def encode(self, payload):
+        import qrcode
+        from qrcode.exceptions import DataOverflowError
+        # The version is fitted on the first payload and only grows if a longer one overflows it
+        if self.version is not None:
+            qr = qrcode.QRCode(version=self.version, error_correction=self.error_correction,
+                               border=self.border, mask_pattern=self.mask_pattern)
+            qr.add_data(payload)
+            try:
+                qr.make(fit=False)
+                return qr.get_matrix()
+            except DataOverflowError:
+                pass
+        qr = qrcode.QRCode(version=None, error_correction=self.error_correction,
+                           border=self.border, mask_pattern=self.mask_pattern)
+        qr.add_data(payload)
+        qr.make(fit=True)
+        self.version = max(self.version or 0, qr.version)
+        return qr.get_matrix()
+    
+    def rasterize(self, matrix):
+        # Nearest-neighbour mapping of pixels to modules, written directly as 8-bit rows
+        modules = len(matrix)
+        index = [(2 * i + 1) * modules // (2 * self.size) for i in range(self.size)]
+        rows = [bytes(0 if matrix[m][x] else 255 for x in index) for m in range(modules)]
+        return Image.frombytes('L', (self.size, self.size), b''.join(rows[m] for m in index))
+    
+    def image(self, payload):
+        return self.rasterize(self.encode(payload))
+
+# Compact QR payload: "HT1:<roll>:<signature>". Everything except the roll number
+# stays in the issued-tickets table, so the symbol fits a low QR version and the
+# characters stay inside the QR alphanumeric set for typical roll numbers.
+QR_PAYLOAD_PREFIX = "HT1"
+# Row key carrying the registry's issue serial into rendering; only set after a reissue
+ISSUE_SERIAL_FIELD = "_issue_serial"
+
+def ticket_signature(secret, roll, name, course, semester, serial=1):
+    # Serial 1 signs exactly what tickets issued before serials existed signed
+    fields = [roll, name, course, semester] + ([str(serial)] if serial > 1 else [])
+    message = "\x1f".join(fields).encode('utf-8')
+    digest = hmac.new(secret.encode('utf-8'), message, hashlib.sha256).digest()
+    # 80 bits of the HMAC in base32 (A-Z, 2-7) keeps the payload alphanumeric
+    return base64.b32encode(digest[:10]).decode('ascii')
+
+def signed_qr_payload(secret, student_data):
+    # "HT1:<roll>:<signature>", or "HT1:<roll>:<serial>:<signature>" once a ticket was reissued
+    roll = student_data['Roll Number']
+    serial = student_data.get(ISSUE_SERIAL_FIELD, 1)
+    signature = ticket_signature(secret, roll, student_data['Student Name'],
+                                 student_data['Course'], student_data['Semester'], serial)
+    if serial > 1:
+        return f"{QR_PAYLOAD_PREFIX}:{roll}:{serial}:{signature}"
+    return f"{QR_PAYLOAD_PREFIX}:{roll}:{signature}"
+
+def parse_qr_payload(payload):
+    # Returns (roll, serial, signature) or None when the payload is not a signed ticket
+    parts = payload.split(":")
+    if len(parts) == 3:
+        prefix, roll, signature = parts
+        serial = 1
+    elif len(parts) == 4 and parts[2].isdigit():
+        prefix, roll, serial, signature = parts[0], parts[1], int(parts[2]), parts[3]
+    else:
+        return None
+    if prefix != QR_PAYLOAD_PREFIX or not roll or not signature:
+        return None
+    return roll, serial, signature
+
+# Issued tickets, indexed by roll number so gate scanners get O(1) lookups.
+# A revocation survives regeneration; reissue() bumps the roll's serial, which
+# makes every earlier ticket for that roll stop verifying.
+class TicketRegistry:
+    def __init__(self, db_path='database.db'):
+        import sqlite3
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.execute('''CREATE TABLE IF NOT EXISTS issued_tickets (
+                            roll TEXT PRIMARY KEY, name TEXT, course TEXT, semester TEXT,
+                            signature TEXT, issued_at TEXT, revoked INTEGER DEFAULT 0,
+                            serial INTEGER DEFAULT 1)''')
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(issued_tickets)')]
+        if 'serial' not in columns:
+            # Registries created before issue serials
+            conn.execute('ALTER TABLE issued_tickets ADD COLUMN serial INTEGER DEFAULT 1')
+        conn.commit()
+        conn.close()
+    
+    def serials(self, rolls):
+        # Current serial for each given roll that has been issued
+        import sqlite3
+        rolls = list(rolls)
+        result = {}
+        conn = sqlite3.connect(self.db_path)
+        for start in range(0, len(rolls), 500):
+            chunk = rolls[start:start + 500]
+            result.update(conn.execute(f"SELECT roll, serial FROM issued_tickets WHERE roll IN "
+                                       f"({','.join('?' * len(chunk))})", chunk).fetchall())
+        conn.close()
+        return result
+    
+    def register(self, students, secret):
+        import sqlite3
+        # One transaction per batch. Re-registering updates the details but never the
+        # revocation or the serial, so regenerating cannot revive a revoked ticket.
+        issued_at = datetime.now().isoformat(timespec='seconds')
+        records = [(student['Roll Number'], student['Student Name'], student['Course'], student['Semester'],
+                    ticket_signature(secret, student['Roll Number'], student['Student Name'],
+                                     student['Course'], student['Semester'],
+                                     student.get(ISSUE_SERIAL_FIELD, 1)), issued_at)
+                   for student in students]
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany('''INSERT INTO issued_tickets (roll, name, course, semester, signature, issued_at)
+                                VALUES (?, ?, ?, ?, ?, ?)
+                                ON CONFLICT(roll) DO UPDATE SET name = excluded.name, course = excluded.course,
+                                    semester = excluded.semester, signature = excluded.signature,
+                                    issued_at = excluded.issued_at''', records)
+        conn.close()
+        return len(records)
+    
+    def revoke(self, roll):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            cursor = conn.execute('UPDATE issued_tickets SET revoked = 1 WHERE roll = ?', (roll,))
+        conn.close()
+        return cursor.rowcount > 0
+    
+    def reissue(self, roll):
+        # New serial for the roll: the next generation run prints a ticket that verifies
+        # while every ticket printed before keeps failing. Returns the serial or None.
+        import sqlite3
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute('UPDATE issued_tickets SET serial = serial + 1, revoked = 0 WHERE roll = ?', (roll,))
+            row = conn.execute('SELECT serial FROM issued_tickets WHERE roll = ?', (roll,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+# Checks scanned payloads against the issued-tickets table. Each thread keeps its
+# own read connection so the service can answer scans concurrently.
+class TicketVerifier:
+    def __init__(self, db_path, secret):
+        self.db_path = db_path
+        self.secret = secret
+        self._local = threading.local()
+    
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+    
+    def verify(self, payload):
+        # Returns (status, details); status is one of valid, revoked, forged, unknown or malformed
+        parsed = parse_qr_payload(payload)
+        if parsed is None:
+            return "malformed", None
+        roll, serial, signature = parsed
+        row = self.connection().execute(
+            'SELECT name, course, semester, revoked, serial FROM issued_tickets WHERE roll = ?', (roll,)).fetchone()
+        if row is None:
+            return "unknown", None
+        name, course, semester, revoked, current_serial = row
+        expected = ticket_signature(self.secret, roll, name, course, semester, serial)
+        if not hmac.compare_digest(expected, signature):
+            return "forged", None
+        details = {'roll': roll, 'name': name, 'course': course, 'semester': semester}
+        # A genuine ticket from before the latest reissue counts as revoked
+        return ("revoked" if revoked or serial != current_serial else "valid"), details
+    
+    def wsgi_app(self, environ, start_response):
+        # GET /verify?payload=... -> {"status": ..., "ticket": {...}}
+        from werkzeug.wrappers import Request, Response
+        request = Request(environ)
+        if request.path != '/verify':
+            return Response('Not Found', status=404)(environ, start_response)
+        status, details = self.verify(request.args.get('payload', ''))
+        body = json.dumps({'status': status, 'ticket': details})
+        return Response(body, mimetype='application/json')(environ, start_response)
+    
+    def serve(self, host='127.0.0.1', port=8765):
+        from werkzeug.serving import run_simple
+        run_simple(host, port, self.wsgi_app, threaded=True)
+
+# Imported schedule rows, so a run can render a course, semester or roll range with an
+# indexed read instead of parsing the whole CSV. Each row is kept as JSON next to the
+# columns it is queried by; roll is the primary key and doubles as the resume cursor.
+class StudentStore:
+    IMPORT_BATCH = 5000
+    
+    def __init__(self, db_path='database.db'):
+        import sqlite3
+        self.db_path = db_path
+        conn = self.connect()
+        # WAL lets a generation run read while another import is writing
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''CREATE TABLE IF NOT EXISTS students (
+                            roll TEXT PRIMARY KEY, name TEXT, course TEXT, semester TEXT,
+                            data TEXT, source TEXT, imported_at TEXT)''')
+        conn.execute('CREATE INDEX IF NOT EXISTS students_course_semester ON students (course, semester, roll)')
+        conn.execute('CREATE INDEX IF NOT EXISTS students_semester ON students (semester, roll)')
+        conn.commit()
+        conn.close()
+    
+    def connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def import_csv(self, csv_path):
+        # Streams the file into the table in batches, all inside one transaction, so a
+        # failed import leaves the previous contents untouched. Rows without a roll number
+        # are rejected; a roll repeated in the file keeps its last row, and a roll that was
+        # already stored is replaced. Returns counts of what happened to the rows read.
+        imported_at = datetime.now().isoformat(timespec='seconds')
+        source = os.path.basename(csv_path)
+        summary = {'rows': 0, 'stored': 0, 'blank_roll': 0, 'duplicate_in_file': 0, 'replaced': 0}
+        seen_rolls = set()
+        conn = self.connect()
+        try:
+            with conn, open(csv_path, 'r', newline='', encoding='utf-8') as file:
+                stored_before = conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
+                reader = csv.DictReader(file)
+                while True:
+                    rows = list(islice(reader, self.IMPORT_BATCH))
+                    if not rows:
+                        break
+                    batch = []
+                    for row in rows:
+                        summary['rows'] += 1
+                        roll = (row.get('Roll Number') or '').strip()
+                        if not roll:
+                            summary['blank_roll'] += 1
+                            continue
+                        if roll in seen_rolls:
+                            summary['duplicate_in_file'] += 1
+                        seen_rolls.add(roll)
+                        batch.append((roll, row.get('Student Name'), row.get('Course'), row.get('Semester'),
+                                      json.dumps({k: v for k, v in row.items() if k is not None}),
+                                      source, imported_at))
+                    conn.executemany('''INSERT OR REPLACE INTO students
+                                        (roll, name, course, semester, data, source, imported_at)
+                                        VALUES (?, ?, ?, ?, ?, ?, ?)''', batch)
+                stored_after = conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
+        finally:
+            conn.close()
+        summary['stored'] = len(seen_rolls)
+        # Rolls written by this import that did not add a row were already in the store
+        summary['replaced'] = len(seen_rolls) - (stored_after - stored_before)
+        logging.info(f"Imported {summary['stored']} students from {csv_path} into {self.db_path} ({summary})")
+        if summary['blank_roll'] or summary['duplicate_in_file']:
+            logging.warning(f"{csv_path}: {summary['blank_roll']} rows without a roll number were skipped, "
+                            f"{summary['duplicate_in_file']} rows repeated an earlier roll number")
+        return summary
+    
+    def query(self, course=None, semester=None, roll_from=None, roll_to=None):
+        # WHERE clause and parameters for a selection; every filter is optional
+        clauses, params = [], []
+        for column, value in (('course', course), ('semester', semester)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if roll_from is not None:
+            clauses.append('roll >= ?')
+            params.append(roll_from)
+        if roll_to is not None:
+            clauses.append('roll <= ?')
+            params.append(roll_to)
+        return clauses, params
+    
+    def iter_students(self, after_roll=None, **selection):
+        # Yields student rows in roll order. after_roll resumes just past a previously
+        # returned roll, which stays an index seek however far into the selection it is.
+        clauses, params = self.query(**selection)
+        if after_roll is not None:
+            clauses.append('roll > ?')
+            params.append(after_roll)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        conn = self.connect()
+        try:
+            cursor = conn.execute(f'SELECT roll, data FROM students{where} ORDER BY roll', params)
+            while True:
+                rows = cursor.fetchmany(self.IMPORT_BATCH)
+                if not rows:
+                    break
+                for roll, data in rows:
+                    yield roll, json.loads(data)
+        finally:
+            conn.close()
+    
+    def count(self, **selection):
+        clauses, params = self.query(**selection)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        conn = self.connect()
+        try:
+            return conn.execute(f'SELECT COUNT(*) FROM students{where}', params).fetchone()[0]
+        finally:
+            conn.close()
+
+# Roll number -> ticket file, size and SHA-256, kept in output_dir/ticket_index.db so
+# lookups, listings and bulk deletes never have to scan a directory of tickets.
+# Paths are stored relative to output_dir so a merged or moved directory stays valid.
+class TicketIndex:
+    FILE = 'ticket_index.db'
+    
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.db_path = os.path.join(output_dir, self.FILE)
+        conn = self.connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''CREATE TABLE IF NOT EXISTS tickets (
+                            roll TEXT PRIMARY KEY, path TEXT, size INTEGER, sha256 TEXT, written_at TEXT)''')
+        conn.commit()
+        conn.close()
+    
+    @classmethod
+    def exists(cls, output_dir):
+        return os.path.exists(os.path.join(output_dir, cls.FILE))
+    
+    @staticmethod
+    def file_digest(path):
+        # (size, SHA-256) of a file as it is on disk
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+                size += len(block)
+        return size, digest.hexdigest()
+    
+    def connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def record(self, records):
+        # records are (roll, relative path, size, sha256); one transaction per batch
+        written_at = datetime.now().isoformat(timespec='seconds')
+        conn = self.connect()
+        with conn:
+            conn.executemany('INSERT OR REPLACE INTO tickets (roll, path, size, sha256, written_at) '
+                             'VALUES (?, ?, ?, ?, ?)', [record + (written_at,) for record in records])
+        conn.close()
+        return len(records)
+    
+    def lookup(self, roll):
+        # (absolute path, size, sha256) or None
+        conn = self.connect()
+        row = conn.execute('SELECT path, size, sha256 FROM tickets WHERE roll = ?', (roll,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return os.path.join(self.output_dir, row[0]), row[1], row[2]
+    
+    def iter_tickets(self, prefix=None):
+        # (roll, absolute path, size, sha256) in roll order; a prefix is a range scan on the key
+        query, params = 'SELECT roll, path, size, sha256 FROM tickets', ()
+        if prefix:
+            query, params = query + ' WHERE roll >= ? AND roll < ?', (prefix, prefix + '\uffff')
+        conn = self.connect()
+        try:
+            cursor = conn.execute(query + ' ORDER BY roll', params)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for roll, path, size, digest in rows:
+                    yield roll, os.path.join(self.output_dir, path), size, digest
+        finally:
+            conn.close()
+    
+    def count(self):
+        conn = self.connect()
+        count = conn.execute('SELECT COUNT(*) FROM tickets').fetchone()[0]
+        conn.close()
+        return count
+    
+    def forget(self, rolls):
+        conn = self.connect()
+        with conn:
+            conn.executemany('DELETE FROM tickets WHERE roll = ?', [(roll,) for roll in rolls])
+        conn.close()
+    
+    def clear(self):
+        # Deletes every indexed ticket, then the subdirectories the hashed layout emptied
+        deleted = 0
+        directories = set()
+        for _, path, _, _ in self.iter_tickets():
+            try:
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            directories.add(os.path.dirname(path))
+        output_dir = os.path.abspath(self.output_dir)
+        for directory in sorted(directories, key=len, reverse=True):
+            while os.path.abspath(directory) != output_dir:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+        conn = self.connect()
+        with conn:
+            conn.execute('DELETE FROM tickets')
+        conn.close()
+        return deleted
+
+# Result of the validation pass. invalid_rows holds every rejected row number; the
+# individual issues are capped so a badly broken file cannot exhaust memory.
+class ValidationReport:
+    MAX_ISSUES = 1000
+    
+    def __init__(self):
+        self.rows_checked = 0
+        self.invalid_rows = set()
+        self.issues = []
+        self.counts = {}
+        # Carried between chunks: the only per-row state is the set of roll numbers seen
+        self.seen_rolls = set()
+        self.valid_dates = set()
+        self.columns_checked = False
+    
+    def add(self, row_number, roll, column, code, message, severity="error"):
+        self.counts[code] = self.counts.get(code, 0) + 1
+        if severity == "error" and row_number is not None:
+            self.invalid_rows.add(row_number)
+        if len(self.issues) < self.MAX_ISSUES:
+            self.issues.append({'row': row_number, 'roll': roll, 'column': column, 'code': code,
+                                'severity': severity, 'message': message})
+    
+    @property
+    def ok(self):
+        return not self.invalid_rows and 'missing_column' not in self.counts
+    
+    def to_dict(self):
+        return {
+            'rows_checked': self.rows_checked,
+            'invalid_rows': len(self.invalid_rows),
+            'counts': self.counts,
+            'issues': self.issues,
+            'issues_truncated': sum(self.counts.values()) > len(self.issues)
+        }
+    
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+# Exam timetable analysis: parses each student's Date/Time columns into minute
+# intervals, finds overlapping exams per student with a sorted sweep and counts
+# slot occupancy across the cohort. Work is linear in the number of students.
+class ScheduleAnalyzer:
+    TIME_RANGE = re.compile(r'(\d{1,2})[:.](\d{2})\s*([AaPp][Mm])?\s*[-\u2013to]+\s*(\d{1,2})[:.](\d{2})\s*([AaPp][Mm])?')
+    MAX_CLASHES = 1000
+    
+    def __init__(self, parse_date):
+        self.parse_date = parse_date
+        self.students = 0
+        self.overlap_count = 0
+        self.same_day_count = 0
+        self.unparsed = 0
+        self.clashes = []
+        self.slots = {}
+        self._dates = {}
+        self._times = {}
+    
+    @staticmethod
+    def to_minutes(hour, minute, meridiem):
+        hour = int(hour)
+        # Sheets mix 12h and 24h ("13:00 PM"), so PM only shifts hours that need it
+        if meridiem and meridiem.upper() == 'PM' and hour < 12:
+            hour += 12
+        return hour * 60 + int(minute)
+    
+    def parse_time_range(self, text):
+        parsed = self._times.get(text)
+        if parsed is None and text not in self._times:
+            match = self.TIME_RANGE.search(text)
+            if match:
+                start = self.to_minutes(*match.group(1, 2, 3))
+                end = self.to_minutes(*match.group(4, 5, 6))
+                parsed = (start, end) if end > start else None
+            self._times[text] = parsed
+        return parsed
+    
+    def exam_date(self, text):
+        if text not in self._dates:
+            self._dates[text] = self.parse_date(text)
+        return self._dates[text]
+    
+    def intervals(self, student_data):
+        # (date, start, end, subject) for every exam with a parseable date and time
+        exams = []
+        for i in range(1, 7):
+            subject = student_data.get(f"Subject {i}")
+            if not subject:
+                continue
+            date = self.exam_date((student_data.get(f"Date {i}") or '').strip())
+            times = self.parse_time_range(student_data.get(f"Time {i}") or '')
+            if date is None or times is None:
+                self.unparsed += 1
+                continue
+            exams.append((date, times[0], times[1], subject))
+        return exams
+    
+    @staticmethod
+    def overlapping_pairs(exams):
+        # Sweep over exams sorted by (date, start); the active list only keeps exams still running
+        pairs = []
+        active = []
+        for exam in sorted(exams):
+            active = [other for other in active if other[0] == exam[0] and other[2] > exam[1]]
+            pairs.extend((other, exam) for other in active)
+            active.append(exam)
+        return pairs
+    
+    def add_student(self, row_number, student_data):
+        self.students += 1
+        exams = self.intervals(student_data)
+        for date, start, end, _ in exams:
+            key = (date, start, end)
+            self.slots[key] = self.slots.get(key, 0) + 1
+        roll = student_data.get('Roll Number')
+        for first, second in self.overlapping_pairs(exams):
+            self.overlap_count += 1
+            self.record_clash(row_number, roll, 'overlap', first, second)
+        days = {}
+        for exam in exams:
+            days.setdefault(exam[0], []).append(exam)
+        busy_days = [same_day for same_day in days.values() if len(same_day) > 1]
+        if busy_days:
+            self.same_day_count += 1
+        for same_day in busy_days:
+            same_day.sort()
+            self.record_clash(row_number, roll, 'same_day', same_day[0], same_day[-1])
+    
+    def record_clash(self, row_number, roll, kind, first, second):
+        if len(self.clashes) < self.MAX_CLASHES:
+            self.clashes.append({
+                'row': row_number, 'roll': roll, 'kind': kind, 'date': first[0].isoformat(),
+                'exams': [f"{first[3]} {self.format_minutes(first[1])}-{self.format_minutes(first[2])}",
+                          f"{second[3]} {self.format_minutes(second[1])}-{self.format_minutes(second[2])}"]
+            })
+    
+    @staticmethod
+    def format_minutes(minutes):
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    
+    def peak_concurrency(self):
+        # Largest number of students sitting exams at the same moment, per date
+        peaks = {}
+        events = sorted((date, minute, delta * count) for (date, start, end), count in self.slots.items()
+                        for minute, delta in ((start, 1), (end, -1)))
+        current = {}
+        for date, _, change in events:
+            current[date] = current.get(date, 0) + change
+            peaks[date] = max(peaks.get(date, 0), current[date])
+        return {date.isoformat(): peak for date, peak in sorted(peaks.items())}
+    
+    def to_dict(self):
+        slots = sorted(self.slots.items(), key=lambda item: (-item[1], item[0]))
+        return {
+            'students': self.students,
+            'overlapping_exams': self.overlap_count,
+            'students_with_same_day_exams': self.same_day_count,
+            'unparsed_exams': self.unparsed,
+            'slot_occupancy': [{'date': date.isoformat(), 'start': self.format_minutes(start),
+                                'end': self.format_minutes(end), 'students': count}
+                               for (date, start, end), count in slots],
+            'peak_concurrency': self.peak_concurrency(),
+            'clashes': self.clashes,
+            'clashes_truncated': self.overlap_count + self.same_day_count > len(self.clashes)
+        }
+    
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+# LRU of rasterized text masks keyed on text, font, anchor and font mode. Repeated
+# strings (course names, dates, time slots, labels) become a bitmap paste instead of
+# a FreeType shaping and rasterization pass. Bounded by the total mask size in bytes.
+class TextSpriteCache:
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sprites = OrderedDict()
+    
+    def get(self, text, font, anchor, fontmode):
+        # Returns (offset_x, offset_y, mask) with the offset relative to the anchor point
+        key = (text, font, anchor, fontmode)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+        self.misses += 1
+        mask, offset = font.getmask2(text, fontmode, anchor=anchor)
+        sprite = (offset[0], offset[1], Image.Image()._new(mask))
+        size = mask.size[0] * mask.size[1]
+        if size <= self.max_bytes:
+            self._sprites[key] = sprite
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._sprites.popitem(last=False)
+                self.bytes -= evicted.width * evicted.height
+                self.evictions += 1
+        return sprite
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0,
+            'evictions': self.evictions,
+            'entries': len(self._sprites),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes
+        }
+
+def _num(value):
+    # Compact decimal for SVG attributes and PDF operators
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+# Stands in for ImageDraw on the vector backend: records the line, rectangle and
+# text calls made by draw_static_layout, draw_table and the student fields, so the
+# vector ticket uses exactly the raster layout. Subclasses serialize the recorded
+# primitives as SVG or as a PDF content stream.
+class VectorCanvas:
+    fontmode = "L"
+    
+    def __init__(self, width, height, ops=None):
+        self.width = width
+        self.height = height
+        self.mode = "vector"
+        self.ops = list(ops) if ops else []
+    
+    def copy(self):
+        return type(self)(self.width, self.height, self.ops)
+    
+    def line(self, xy, fill="black", width=1):
+        (x0, y0), (x1, y1) = xy
+        # Pillow fills the pixel row or column that starts at the coordinate
+        self.ops.append(('line', x0 + 0.5, y0 + 0.5, x1 + 0.5, y1 + 0.5, width))
+    
+    def rectangle(self, xy, outline="black", width=1):
+        (x0, y0), (x1, y1) = xy
+        # Pillow strokes inside the box while a vector stroke is centred on the path
+        inset = width / 2
+        self.ops.append(('rect', x0 + inset, y0 + inset, x1 + 1 - inset, y1 + 1 - inset, width))
+    
+    def text(self, position, text, font=None, fill="black", anchor="lt"):
+        # Anchors are resolved with the Pillow font's metrics, matching the raster ticket
+        x, y = position
+        size = getattr(font, 'size', 11)
+        ascent, descent = font.getmetrics() if hasattr(font, 'getmetrics') else (size * 0.8, size * 0.2)
+        bold = hasattr(font, 'getname') and 'Bold' in (font.getname()[1] or '')
+        width = font.getlength(text) if hasattr(font, 'getlength') else len(text) * size * 0.5
+        horizontal, vertical = anchor[0], anchor[1]
+        baseline = {'t': y + ascent, 'm': y + (ascent - descent) / 2, 'b': y - descent}.get(vertical, y)
+        left = x - {'m': width / 2, 'r': width}.get(horizontal, 0)
+        self.ops.append(('text', left, x, baseline, text, size, bold, horizontal))
+    
+    def qr(self, matrix, position, size):
+        scale = size / len(matrix)
+        x, y = position
+        for column, row, width, height in self.merged_rectangles(matrix):
+            self.ops.append(('fill', x + column * scale, y + row * scale, width * scale, height * scale))
+    
+    @staticmethod
+    def merged_rectangles(matrix):
+        # Horizontal runs of dark modules, grown downwards while the next row repeats
+        # the same run; (column, row, width, height) in modules
+        rectangles = []
+        open_runs = {}
+        for row_index, row in enumerate(matrix):
+            runs = set()
+            column = 0
+            while column < len(row):
+                if row[column]:
+                    start = column
+                    while column < len(row) and row[column]:
+                        column += 1
+                    runs.add((start, column))
+                else:
+                    column += 1
+            for run in [run for run in open_runs if run not in runs]:
+                top = open_runs.pop(run)
+                rectangles.append((run[0], top, run[1] - run[0], row_index - top))
+            for run in runs:
+                open_runs.setdefault(run, row_index)
+        for run, top in open_runs.items():
+            rectangles.append((run[0], top, run[1] - run[0], len(matrix) - top))
+        return sorted(rectangles, key=lambda rect: (rect[1], rect[0]))
+    
+    def save(self, fp, format=None, **options):
+        # Same call shape as Image.save, so save_image handles both backends
+        data = self.render()
+        if isinstance(fp, (str, bytes, os.PathLike)):
+            with open(fp, 'wb') as file:
+                file.write(data)
+        else:
+            fp.write(data)
+
+class SvgCanvas(VectorCanvas):
+    def render(self):
+        from xml.sax.saxutils import escape
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+                 f'viewBox="0 0 {self.width} {self.height}">',
+                 '<rect width="100%" height="100%" fill="white"/>']
+        strokes = {}
+        texts = []
+        fills = []
+        for op in self.ops:
+            kind = op[0]
+            if kind == 'line':
+                _, x0, y0, x1, y1, width = op
+                strokes.setdefault(width, []).append(f"M{_num(x0)} {_num(y0)}L{_num(x1)} {_num(y1)}")
+            elif kind == 'rect':
+                _, x0, y0, x1, y1, width = op
+                strokes.setdefault(width, []).append(
+                    f"M{_num(x0)} {_num(y0)}H{_num(x1)}V{_num(y1)}H{_num(x0)}Z")
+            elif kind == 'text':
+                _, left, x, baseline, text, size, bold, horizontal = op
+                # Centred text keeps text-anchor so it stays centred if the viewer substitutes the font
+                position = (f'x="{_num(x)}" text-anchor="middle"' if horizontal == 'm'
+                            else f'x="{_num(left)}"')
+                weight = ' font-weight="bold"' if bold else ''
+                texts.append(f'<text {position} y="{_num(baseline)}" font-size="{size}"{weight}>{escape(text)}</text>')
+            else:
+                _, x, y, width, height = op
+                fills.append(f"M{_num(x)} {_num(y)}h{_num(width)}v{_num(height)}h-{_num(width)}z")
+        for width, paths in strokes.items():
+            parts.append(f'<path d="{"".join(paths)}" fill="none" stroke="black" stroke-width="{_num(width)}"/>')
+        if fills:
+            # One path for the whole QR symbol; crispEdges avoids hairline seams between modules
+            parts.append(f'<path d="{"".join(fills)}" fill="black" shape-rendering="crispEdges"/>')
+        parts.append('<g font-family="Arial, Helvetica, sans-serif" fill="black">')
+        parts.extend(texts)
+        parts.append('</g>')
+        parts.append('</svg>\n')
+        return '\n'.join(parts).encode('utf-8')
+
+class PdfCanvas(VectorCanvas):
+    # Text is set in the standard Helvetica fonts (no embedding), which share Arial's metrics
+    def render(self):
+        # Content stream in ticket pixels with the y axis flipped to match the layout code
+        parts = [f"1 0 0 -1 0 {self.height} cm"]
+        fills = []
+        for op in self.ops:
+            kind = op[0]
+            if kind == 'line':
+                _, x0, y0, x1, y1, width = op
+                parts.append(f"{_num(width)} w {_num(x0)} {_num(y0)} m {_num(x1)} {_num(y1)} l S")
+            elif kind == 'rect':
+                _, x0, y0, x1, y1, width = op
+                parts.append(f"{_num(width)} w {_num(x0)} {_num(y0)} {_num(x1 - x0)} {_num(y1 - y0)} re S")
+            elif kind == 'text':
+                _, left, _, baseline, text, size, bold, _ = op
+                encoded = text.encode('cp1252', 'replace').decode('latin-1')
+                escaped = encoded.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+                parts.append(f"BT /F{2 if bold else 1} {size} Tf 1 0 0 -1 {_num(left)} {_num(baseline)} Tm "
+                             f"({escaped}) Tj ET")
+            else:
+                _, x, y, width, height = op
+                fills.append(f"{_num(x)} {_num(y)} {_num(width)} {_num(height)} re")
+        if fills:
+            parts.append('\n'.join(fills) + ' f')
+        return '\n'.join(parts).encode('latin-1')
+
+# Minimal streaming PDF writer: every image is written to disk as soon as it is
+# added, so only the current page's placements are ever held in memory
+class PdfTicketWriter:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.offsets = {}
+        self.page_refs = []
+        self.next_id = 3  # 1 is the catalog and 2 the page tree, both written on close
+        self.font_refs = None
+        self.file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    
+    def write_object(self, body, stream=None):
+        obj_id = self.next_id
+        self.next_id += 1
+        self.write_object_at(obj_id, body, stream)
+        return obj_id
+    
+    def write_object_at(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f"{obj_id} 0 obj\n".encode('ascii'))
+        if stream is None:
+            self.file.write(body.encode('ascii'))
+        else:
+            self.file.write(f"{body[:-2]} /Length {len(stream)} >>\nstream\n".encode('ascii'))
+            self.file.write(stream)
+            self.file.write(b'\nendstream')
+        self.file.write(b'\nendobj\n')
+    
+    def add_image(self, encoded):
+        width, height, mode, data = encoded
+        if mode == "vector":
+            return self.add_form(width, height, data)
+        color_space, bits = {'1': ('/DeviceGray', 1), 'L': ('/DeviceGray', 8)}.get(mode, ('/DeviceRGB', 8))
+        return self.write_object(f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                                 f"/ColorSpace {color_space} /BitsPerComponent {bits} /Filter /FlateDecode >>", data)
+    
+    def standard_fonts(self):
+        # Helvetica and Helvetica-Bold, written once per file and shared by every vector ticket
+        if self.font_refs is None:
+            self.font_refs = tuple(self.write_object(f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} "
+                                                     f"/Encoding /WinAnsiEncoding >>")
+                                   for name in ("Helvetica", "Helvetica-Bold"))
+        return self.font_refs
+    
+    def add_form(self, width, height, data):
+        # A vector ticket as a form XObject. Its matrix maps the ticket onto the unit
+        # square, so add_page places it exactly like an image.
+        regular, bold = self.standard_fonts()
+        return self.write_object(f"<< /Type /XObject /Subtype /Form /BBox [0 0 {width} {height}] "
+                                 f"/Matrix [{1 / width:.9f} 0 0 {1 / height:.9f} 0 0] "
+                                 f"/Resources << /Font << /F1 {regular} 0 R /F2 {bold} 0 R >> >> "
+                                 f"/Filter /FlateDecode >>", data)
+    
+    def add_page(self, page_width, page_height, placements):
+        # placements: (image or form object id, x, y, width, height) in points from the bottom-left corner
+        content = ''.join(f"q {w:.2f} 0 0 {h:.2f} {x:.2f} {y:.2f} cm /Im{ref} Do Q\n"
+                          for ref, x, y, w, h in placements).encode('ascii')
+        content_id = self.write_object("<< >>", content)
+        xobjects = ' '.join(f"/Im{ref} {ref} 0 R" for ref, *_ in placements)
+        self.page_refs.append(self.write_object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+            f"/Resources << /XObject << {xobjects} >> >> /Contents {content_id} 0 R >>"))
+    
+    def close(self):
+        kids = ' '.join(f"{ref} 0 R" for ref in self.page_refs)
+        self.write_object_at(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_refs)} >>")
+        self.write_object_at(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n0000000000 65535 f \n".encode('ascii'))
+        for obj_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[obj_id]:010d} 00000 n \n".encode('ascii'))
+        self.file.write(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\n"
+                        f"startxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+# Streams tickets into chunked PDF files, either one ticket per page or N-up on A4 sheets
+class PdfTicketSink:
+    A4_SIZE = (595.0, 842.0)
+    SHEET_MARGIN = 28.0
+    
+    def __init__(self, output_dir, n_up=1, tickets_per_file=1000, dpi=100, first_part=1):
+        self.output_dir = output_dir
+        self.n_up = max(1, n_up)
+        self.tickets_per_file = max(1, tickets_per_file)
+        self.dpi = dpi
+        self.part = first_part
+        self.writer = None
+        self.tickets_in_file = 0
+        self.pending = []
+        self.file_completed = False
+    
+    def file_path(self, part):
+        return os.path.join(self.output_dir, f"hall_tickets_{part:04d}.pdf")
+    
+    def add(self, encoded):
+        # Returns the PDF file the ticket went into. file_completed is set when that file was just closed.
+        self.file_completed = False
+        if self.writer is None:
+            self.writer = PdfTicketWriter(self.file_path(self.part))
+        path = self.writer.path
+        self.pending.append((self.writer.add_image(encoded), encoded[0], encoded[1]))
+        self.tickets_in_file += 1
+        if len(self.pending) == self.n_up:
+            self.flush_page()
+        if self.tickets_in_file >= self.tickets_per_file:
+            self.close_file()
+        return path
+    
+    def flush_page(self):
+        if not self.pending:
+            return
+        if self.n_up == 1:
+            ref, width, height = self.pending[0]
+            page_width, page_height = width * 72 / self.dpi, height * 72 / self.dpi
+            placements = [(ref, 0, 0, page_width, page_height)]
+        else:
+            page_width, page_height = self.A4_SIZE
+            cols = 1 if self.n_up <= 2 else 2
+            rows = -(-self.n_up // cols)
+            cell_width = (page_width - 2 * self.SHEET_MARGIN) / cols
+            cell_height = (page_height - 2 * self.SHEET_MARGIN) / rows
+            placements = []
+            for i, (ref, width, height) in enumerate(self.pending):
+                scale = min(cell_width / width, cell_height / height)
+                w, h = width * scale, height * scale
+                x = self.SHEET_MARGIN + (i % cols) * cell_width + (cell_width - w) / 2
+                y = page_height - self.SHEET_MARGIN - (i // cols + 1) * cell_height + (cell_height - h) / 2
+                placements.append((ref, x, y, w, h))
+        self.writer.add_page(page_width, page_height, placements)
+        self.pending = []
+    
+    def close_file(self):
+        if self.writer is None:
+            return
+        self.flush_page()
+        self.writer.close()
+        logging.info(f"Wrote {self.tickets_in_file} hall tickets to {self.writer.path}")
+        self.writer = None
+        self.tickets_in_file = 0
+        self.part += 1
+        self.file_completed = True
+    
+    def close(self):
+        self.close_file()
+
+def shard_of(roll, shards, strategy="hash", boundaries=()):
+    # Shard index for a roll number. "hash" uses CRC-32 so every node and process agrees;
+    # "range" uses sorted boundaries, shard i holding boundaries[i-1] <= roll < boundaries[i].
+    if strategy == "range":
+        index = 0
+        while index < len(boundaries) and roll >= boundaries[index]:
+            index += 1
+        return index
+    return zlib.crc32((roll or '').encode('utf-8')) % shards
+
+# HallTicketGenerator class with improved QR code positioning
+class HallTicketGenerator:
+    # Bump whenever the rendered ticket changes so incremental runs redraw everything
+    LAYOUT_VERSION = 2
+    # One-file-per-ticket formats and their extensions; "pdf" and "sheets" are written by PdfTicketSink
+    FILE_FORMATS = {"png": ".png", "webp": ".webp", "tiff": ".tif", "svg": ".svg"}
+    # Minimum seconds between manifest rewrites during an incremental run
+    MANIFEST_SAVE_SECONDS = 5
+    
+    def __init__(self, csv_path, output_dir, college_name="COLLEGE NAME", workers=1, chunksize=32,
+                 use_template=True, incremental=False, output_format="png", n_up=4,
+                 tickets_per_file=1000, qr_secret=None, registry_path=None, image_mode="L",
+                 png_compress_level=6, png_optimize=False, writer_threads=0,
+                 text_cache_bytes=8 * 1024 * 1024, validation="report", clash_check="off",
+                 store_path=None, student_query=None, shard=None, layout="flat", index_tickets=True,
+                 backend="pillow"):
+        self.csv_path = csv_path
+        self.output_dir = output_dir
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        # Configured before anything below can log, otherwise the first warning gives the
+        # root logger a stderr handler and setup_logging never attaches the log file
+        setup_logging(os.path.join(output_dir, 'hall_ticket_generator.log'))
+        self.college_name = college_name
+        # workers=None uses every available core, workers=1 renders in-process
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.chunksize = max(1, chunksize)
+        self.use_template = use_template
+        # "png", "webp" and "tiff" (Group 4) write one file per student, "pdf" one ticket
+        # per page and "sheets" n_up tickets per A4 page, both chunked into tickets_per_file PDFs
+        self.output_format = output_format
+        self.n_up = n_up if output_format == "sheets" else 1
+        # "pillow" rasterizes with ImageDraw; "vector" records the same layout as SVG ("svg")
+        # or as PDF drawing operators ("pdf", "sheets") with the QR code as merged rectangles
+        self.backend = "vector" if output_format == "svg" else backend
+        if self.backend == "vector" and output_format in ("png", "webp", "tiff"):
+            logging.warning(f"The vector backend cannot write {output_format}, using Pillow")
+            self.backend = "pillow"
+        self.tickets_per_file = tickets_per_file
+        # Tickets are black-and-white, so "L" (grayscale) or "1" (bilevel) avoid paying for three channels
+        self.image_mode = image_mode
+        self.png_compress_level = png_compress_level
+        self.png_optimize = png_optimize
+        # Background threads that encode and write files while the next ticket renders (0 = inline)
+        self.writer_threads = writer_threads
+        self._writer = None
+        self._pending_writes = None
+        self._write_futures = []
+        self._write_errors = 0
+        # "flat" puts every ticket in output_dir, "hashed" spreads them over 65536
+        # subdirectories (two levels named after the roll number's SHA-256) for huge cohorts
+        self.layout = layout
+        # Written tickets are recorded in TicketIndex; workers only collect the records
+        self.index_tickets = index_tickets
+        self.ticket_index = None
+        self._index_records = []
+        self._ticket_dirs = set()
+        # "report" checks each streamed chunk and skips rejected rows, "strict" checks the
+        # whole input first and aborts on any rejected row, "off" leaves checking to create_hall_ticket
+        self.validation = validation
+        self.validation_report = None
+        # Exam clash analysis: "report" writes schedule_report.json as the run streams,
+        # "strict" reads the whole input first and refuses to generate while any student has overlapping exams
+        self.clash_check = clash_check
+        self.schedule_report = None
+        # With store_path rows come from StudentStore instead of csv_path, filtered by
+        # student_query (course, semester, roll_from, roll_to)
+        self.store = StudentStore(store_path) if store_path else None
+        self.student_query = student_query or {}
+        # Only render one shard of the input: {'index', 'count', 'strategy', 'boundaries'} as in ShardPlan
+        self.shard = shard
+        self.incremental = incremental
+        if incremental and output_format not in self.FILE_FORMATS:
+            logging.warning("Incremental mode needs one file per ticket, disabling it for PDF output")
+            self.incremental = False
+        # Signing key for compact QR payloads, taken from HALL_TICKET_SECRET when not given.
+        # Without a key the old JSON payload is used and no tickets are registered.
+        self.qr_secret = qr_secret or os.environ.get('HALL_TICKET_SECRET')
+        self.registry = TicketRegistry(registry_path) if registry_path and self.qr_secret else None
+        self._templates = {}
+        # Byte position in the CSV reached by iter_hall_tickets, used for progress reporting
+        self.bytes_processed = 0
+        self.metrics = RunMetrics()
+        
+        try:
+            self.title_font = ImageFont.truetype("arial.ttf", 18)
+            self.header_font = ImageFont.truetype("arialbd.ttf", 14)
+            self.normal_font = ImageFont.truetype("arial.ttf", 12)
+            self.small_font = ImageFont.truetype("arial.ttf", 10)
+        except IOError:
+            # Provide better fallback for font loading failures
+            logging.warning("Could not load specified fonts, using default fonts")
+            self.title_font = ImageFont.load_default()
+            self.header_font = ImageFont.load_default()
+            self.normal_font = ImageFont.load_default()
+            self.small_font = ImageFont.load_default()
+        
+        self.width = 1000
+        self.height = 750
+        self.table_start_x = 50
+        self.table_start_y = 200
+        self.table_width = 800  # Reduced width to make room for QR code
+        self.row_height = 50
+        self.num_rows = 7
+        self.qr_engine = QREngine(size=120)
+        self.text_cache_bytes = text_cache_bytes
+        self.text_cache = TextSpriteCache(text_cache_bytes) if text_cache_bytes else None
+
+        logging.info(f"HallTicketGenerator initialized at {datetime.now()}")
+
+    def iter_csv_rows(self, start_row=0, start_offset=None):
+        # Streams (row_number, row, next_offset) without materializing the file.
+        # next_offset is the byte position just after the row, so a run can be
+        # resumed with start_offset=next_offset and start_row=row_number + 1.
+        with open(self.csv_path, 'rb') as file:
+            header = next(csv.reader([file.readline().decode('utf-8')]), None)
+            if not header:
+                return
+            row_number = 0
+            if start_offset:
+                file.seek(start_offset)
+                row_number = start_row
+            position = [file.tell()]
+            
+            def lines():
+                for line in iter(file.readline, b''):
+                    position[0] = file.tell()
+                    yield line.decode('utf-8')
+            
+            reader = csv.DictReader(lines(), fieldnames=header)
+            while True:
+                parse_start = time.perf_counter()
+                row = next(reader, None)
+                if row is None:
+                    break
+                self.metrics.record("csv_parse", time.perf_counter() - parse_start)
+                if row_number >= start_row:
+                    yield row_number, row, position[0]
+                row_number += 1
+    
+    def iter_store_rows(self, start_row=0, after_roll=None):
+        # Same (row_number, row, next_offset) shape as iter_csv_rows; the offset is the
+        # roll number, so checkpoints resume with an index seek past the last roll
+        row_number = start_row if after_roll else 0
+        for roll, row in self.store.iter_students(after_roll, **self.student_query):
+            if row_number >= start_row:
+                yield row_number, row, roll
+            row_number += 1
+    
+    def iter_rows(self, start_row=0, start_offset=None):
+        if self.store is not None:
+            rows = self.iter_store_rows(start_row, start_offset)
+        else:
+            rows = self.iter_csv_rows(start_row, start_offset)
+        if self.shard is None:
+            return rows
+        shard = self.shard
+        return (item for item in rows
+                if shard_of(item[1].get('Roll Number'), shard['count'], shard['strategy'],
+                            shard.get('boundaries', ())) == shard['index'])
+    
+    def read_csv_data(self):
+        try:
+            students = [row for _, row, _ in self.iter_csv_rows()]
+            logging.info(f"CSV data read successfully with {len(students)} records")
+            return students
+        except Exception as e:
+            logging.error(f"Error reading CSV file: {e}")
+            return []
+    
+    def qr_payload(self, student_data):
+        if self.qr_secret:
+            return signed_qr_payload(self.qr_secret, student_data)
+        # Legacy unsigned payload, only include necessary data in QR code to reduce size
+        qr_data = {
+            'name': student_data['Student Name'],
+            'roll': student_data['Roll Number'],
+            'course': student_data['Course'],
+            'semester': student_data['Semester']
+        }
+        return json.dumps(qr_data)
+    
+    def generate_qr_code(self, student_data):
+        # A Pillow image, or the module matrix for the vector backend
+        try:
+            if self.backend == "vector":
+                qr_img = self.qr_engine.encode(self.qr_payload(student_data))
+            else:
+                qr_img = self.qr_engine.image(self.qr_payload(student_data))
+            logging.debug(f"QR code generated successfully for {student_data['Roll Number']}")
+            return qr_img
+        except Exception as e:
+            logging.error(f"Error generating QR code: {e}")
+            return None
+    
+    def draw_line(self, draw, start_pos, end_pos, width=1):
+        draw.line([start_pos, end_pos], fill="black", width=width)
+    
+    def draw_rectangle(self, draw, top_left, bottom_right, outline="black", width=1):
+        draw.rectangle([top_left, bottom_right], outline=outline, width=width)
+    
+    def draw_text(self, draw, position, text, font, fill="black", anchor="lt", cacheable=True):
+        # Fields unique to one student skip the sprite cache so they do not evict shared strings
+        x, y = position
+        if (not cacheable or self.text_cache is None or x != int(x) or y != int(y) or "\n" in text
+                or not isinstance(font, ImageFont.FreeTypeFont) or isinstance(draw, VectorCanvas)):
+            draw.text(position, text, font=font, fill=fill, anchor=anchor)
+            return
+        offset_x, offset_y, mask = self.text_cache.get(text, font, anchor, draw.fontmode)
+        draw.bitmap((int(x) + offset_x, int(y) + offset_y), mask, fill=fill)
+    
+    def table_column_widths(self):
+        return {
+            'sno_width': 50,
+            'subject_width': 200,
+            'date_width': 150,
+            'time_width': 150,
+            'signature_width': 250  # Adjusted to fit within reduced table width
+        }
+    
+    def draw_table(self, draw):
+        table_end_x = self.table_start_x + self.table_width
+        table_end_y = self.table_start_y + self.row_height * self.num_rows
+        self.draw_rectangle(draw, (self.table_start_x, self.table_start_y), 
+                           (table_end_x, table_end_y), width=2)
+        
+        for i in range(1, self.num_rows):
+            y = self.table_start_y + i * self.row_height
+            self.draw_line(draw, (self.table_start_x, y), 
+                          (table_end_x, y), width=1)
+        
+        table_dims = self.table_column_widths()
+        sno_width = table_dims['sno_width']
+        subject_width = table_dims['subject_width']
+        date_width = table_dims['date_width']
+        time_width = table_dims['time_width']
+        signature_width = table_dims['signature_width']
+        
+        x = self.table_start_x + sno_width
+        self.draw_line(draw, (x, self.table_start_y), 
+                      (x, table_end_y), width=1)
+        
+        x += subject_width
+        self.draw_line(draw, (x, self.table_start_y), 
+                      (x, table_end_y), width=1)
+        
+        x += date_width
+        self.draw_line(draw, (x, self.table_start_y), 
+                      (x, table_end_y), width=1)
+        
+        x += time_width
+        self.draw_line(draw, (x, self.table_start_y), 
+                      (x, table_end_y), width=1)
+        
+        header_y = self.table_start_y + self.row_height / 2
+        self.draw_text(draw, (self.table_start_x + sno_width / 2, header_y), 
+                      "S.No", self.header_font, anchor="mm")
+        self.draw_text(draw, (self.table_start_x + sno_width + subject_width / 2, header_y), 
+                      "Subject Name", self.header_font, anchor="mm")
+        self.draw_text(draw, (self.table_start_x + sno_width + subject_width + date_width / 2, header_y), 
+                      "Date", self.header_font, anchor="mm")
+        self.draw_text(draw, (self.table_start_x + sno_width + subject_width + date_width + time_width / 2, header_y), 
+                      "Time", self.header_font, anchor="mm")
+        self.draw_text(draw, (self.table_start_x + sno_width + subject_width + date_width + time_width + signature_width / 2, header_y), 
+                      "Invigilator Signature", self.header_font, anchor="mm")
+        
+        return table_dims
+    
+    def draw_static_layout(self, draw):
+        # Everything on the ticket that does not depend on the student
+        self.draw_text(draw, (self.width / 2, 40), self.college_name, 
+                      self.title_font, anchor="mm")
+        self.draw_text(draw, (self.width / 2, 70), "EXAMINATION HALL TICKET", 
+                      self.header_font, anchor="mm")
+        
+        self.draw_text(draw, (60, 110), "Student Name:", self.header_font)
+        self.draw_text(draw, (60, 140), "Roll Number:", self.header_font)
+        self.draw_text(draw, (60, 170), "Course:", self.header_font)
+        self.draw_text(draw, (400, 110), "Semester:", self.header_font)
+        
+        self.draw_table(draw)
+        
+        instructions_y = self.table_start_y + self.row_height * self.num_rows + 30
+        self.draw_text(draw, (60, instructions_y), "Instructions:", self.header_font)
+        
+        instructions = [
+            "1. Students must bring this hall ticket for every exam.",
+            "2. Latecomers will not be allowed to enter the exam hall.",
+            "3. Use of electronic gadgets is strictly prohibited.",
+            "4. Follow all exam guidelines as instructed by the invigilator."
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            self.draw_text(draw, (60, instructions_y + 25 + i * 20), instruction, self.normal_font)
+        
+        sig_y = instructions_y + 25 + len(instructions) * 20 + 30
+        self.draw_text(draw, (60, sig_y), "Principal's Signature:", self.normal_font)
+        self.draw_line(draw, (200, sig_y + 10), (350, sig_y + 10))
+        self.draw_text(draw, (500, sig_y), "Student's Signature:", self.normal_font)
+        self.draw_line(draw, (640, sig_y + 10), (790, sig_y + 10))
+    
+    def new_canvas(self):
+        # A blank ticket and the object the draw_* helpers draw on
+        if self.backend == "vector":
+            canvas = (SvgCanvas if self.output_format == "svg" else PdfCanvas)(self.width, self.height)
+            return canvas, canvas
+        image = Image.new(self.image_mode, (self.width, self.height), color='white')
+        return image, ImageDraw.Draw(image)
+    
+    def template_key(self):
+        return (self.college_name, self.backend, self.output_format, self.image_mode, self.width, self.height, self.table_start_x,
+                self.table_start_y, self.table_width, self.row_height, self.num_rows)
+    
+    def get_template(self):
+        # Static parts are rasterized once per generator and copied for every ticket
+        key = self.template_key()
+        template = self._templates.get(key)
+        if template is None:
+            template, draw = self.new_canvas()
+            self.draw_static_layout(draw)
+            self._templates[key] = template
+            logging.info(f"Ticket template rendered for {self.college_name}")
+        return template
+    
+    REQUIRED_COLUMNS = ['Student Name', 'Roll Number', 'Course', 'Semester']
+    DATE_FORMATS = ('%d-%m-%Y', '%d/%m/%Y')
+    # Characters that are unsafe in "<roll>_hall_ticket.png" on Windows or POSIX
+    UNSAFE_FILENAME = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+    
+    def schedule_report_path(self):
+        return os.path.join(self.output_dir, 'schedule_report.json')
+    
+    def validation_report_path(self):
+        return os.path.join(self.output_dir, 'validation_report.json')
+    
+    def validate_csv(self, start_row=0, start_offset=None, analyzer=None):
+        # One pass over the whole input before anything is rendered, for strict checks and
+        # the "validate" command. A ScheduleAnalyzer, when given, sees every row during the same pass.
+        report = ValidationReport()
+        for row_number, row, _ in self.iter_rows(start_row, start_offset):
+            self.validate_row(report, row_number, row)
+            if analyzer is not None:
+                analyzer.add_student(row_number, row)
+        return report
+    
+    def validate_row(self, report, row_number, row):
+        # Checks one row against the rows the report has already seen, so the same checks
+        # run on streamed chunks and in the full pass
+        report.rows_checked += 1
+        if not report.columns_checked:
+            report.columns_checked = True
+            for column in self.REQUIRED_COLUMNS:
+                if column not in row:
+                    report.add(None, None, column, 'missing_column', f"Required column '{column}' is missing")
+        if 'missing_column' in report.counts:
+            # Without the required columns no row can be rendered
+            report.invalid_rows.add(row_number)
+        roll = (row.get('Roll Number') or '').strip()
+        for column in self.REQUIRED_COLUMNS:
+            if not (row.get(column) or '').strip():
+                report.add(row_number, roll or None, column, 'empty_field', f"'{column}' is empty")
+        if roll:
+            if roll in ('.', '..') or self.UNSAFE_FILENAME.search(roll) or roll != row['Roll Number']:
+                report.add(row_number, roll, 'Roll Number', 'unsafe_filename',
+                           f"Roll Number {row['Roll Number']!r} cannot be used in a file name")
+            if roll in report.seen_rolls:
+                report.add(row_number, roll, 'Roll Number', 'duplicate_roll',
+                           f"Roll Number {roll} already used on an earlier row")
+            else:
+                report.seen_rolls.add(roll)
+        for i in range(1, 7):
+            if not row.get(f"Subject {i}"):
+                continue
+            date_text = (row.get(f"Date {i}") or '').strip()
+            if not date_text:
+                report.add(row_number, roll or None, f"Date {i}", 'missing_date',
+                           f"Subject {i} has no date", severity="warning")
+            elif date_text not in report.valid_dates:
+                if self.parse_exam_date(date_text) is None:
+                    report.add(row_number, roll or None, f"Date {i}", 'malformed_date',
+                               f"Date {i} {date_text!r} is not DD-MM-YYYY")
+                else:
+                    report.valid_dates.add(date_text)
+    
+    def parse_exam_date(self, text):
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(text, date_format).date()
+            except ValueError:
+                pass
+        return None
+    
+    def validate_student(self, student_data):
+        # Check if required keys exist in student_data
+        required_keys = ['Student Name', 'Roll Number', 'Course', 'Semester']
+        for key in required_keys:
+            if key not in student_data or not student_data[key]:
+                logging.error(f"Missing required data: {key} for student {student_data.get('Roll Number', 'Unknown')}")
+                return False
+        return True
+    
+    def render_hall_ticket(self, student_data):
+        render_start = time.perf_counter()
+        if self.use_template:
+            image = self.get_template().copy()
+            draw = image if self.backend == "vector" else ImageDraw.Draw(image)
+        else:
+            image, draw = self.new_canvas()
+            self.draw_static_layout(draw)
+        
+        # Student information section - adjusted to leave space for QR code
+        self.draw_text(draw, (200, 110), student_data['Student Name'], self.normal_font, cacheable=False)
+        self.draw_text(draw, (200, 140), student_data['Roll Number'], self.normal_font, cacheable=False)
+        self.draw_text(draw, (200, 170), student_data['Course'], self.normal_font)
+        self.draw_text(draw, (480, 110), student_data['Semester'], self.normal_font)
+        
+        qr_start = time.perf_counter()
+        qr_img = self.generate_qr_code(student_data)
+        qr_elapsed = time.perf_counter() - qr_start
+        self.metrics.record("qr_encode", qr_elapsed)
+        if qr_img:
+            # Already rasterized at the final size by the QR engine
+            qr_size = self.qr_engine.size
+            # Position QR code in top right corner with proper padding
+            qr_position = (self.width - qr_size - 60, 50)
+            if self.backend == "vector":
+                image.qr(qr_img, qr_position, qr_size)
+            else:
+                image.paste(qr_img, qr_position)
+        
+        table_dims = self.table_column_widths()
+        
+        for i in range(1, 7):
+            subject_key = f"Subject {i}"
+            date_key = f"Date {i}"
+            time_key = f"Time {i}"
+            
+            if subject_key in student_data and student_data[subject_key]:
+                row_y = self.table_start_y + (i) * self.row_height + self.row_height / 2
+                self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] / 2, row_y), 
+                              str(i), self.normal_font, anchor="mm")
+                self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] + table_dims['subject_width'] / 2, row_y), 
+                              student_data[subject_key], self.normal_font, anchor="mm")
+                date_text = student_data.get(date_key, "DD/MM/YYYY")
+                self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] + table_dims['subject_width'] + 
+                                    table_dims['date_width'] / 2, row_y), 
+                              date_text, self.normal_font, anchor="mm")
+                time_text = student_data.get(time_key, "HH:MM - HH:MM")
+                self.draw_text(draw, (self.table_start_x + table_dims['sno_width'] + table_dims['subject_width'] + 
+                                    table_dims['date_width'] + table_dims['time_width'] / 2, row_y), 
+                              time_text, self.normal_font, anchor="mm")
+        
+        self.metrics.record("drawing", time.perf_counter() - render_start - qr_elapsed)
+        return image
+    
+    def save_options(self):
+        if self.output_format == "svg":
+            return {'format': 'SVG'}
+        if self.output_format == "webp":
+            return {'format': 'WEBP', 'lossless': True}
+        if self.output_format == "tiff":
+            return {'format': 'TIFF', 'compression': 'group4'}
+        return {'format': 'PNG', 'compress_level': self.png_compress_level, 'optimize': self.png_optimize}
+    
+    def save_image(self, image, save_path, roll=None):
+        with self.metrics.timed("image_save"):
+            if self.output_format == "tiff" and image.mode != '1':
+                # Group 4 fax compression is only defined for bilevel images
+                image = image.convert('1')
+            if not self.index_tickets:
+                image.save(save_path, **self.save_options())
+                return
+            # Encoded in memory so the index gets size and hash without reading the file back
+            buffer = io.BytesIO()
+            image.save(buffer, **self.save_options())
+            data = buffer.getbuffer()
+            with open(save_path, 'wb') as file:
+                file.write(data)
+            self._index_records.append((roll, os.path.relpath(save_path, self.output_dir),
+                                        len(data), hashlib.sha256(data).hexdigest()))
+    
+    def ticket_relpath(self, roll):
+        filename = f"{roll}_hall_ticket{self.FILE_FORMATS[self.output_format]}"
+        if self.layout != "hashed":
+            return filename
+        digest = hashlib.sha256(roll.encode('utf-8')).hexdigest()
+        return os.path.join(digest[:2], digest[2:4], filename)
+    
+    def take_index_records(self):
+        records, self._index_records = self._index_records, []
+        return records
+    
+    def write_hall_ticket(self, image, student_data):
+        roll = student_data['Roll Number']
+        save_path = os.path.join(self.output_dir, self.ticket_relpath(roll))
+        directory = os.path.dirname(save_path)
+        if directory not in self._ticket_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._ticket_dirs.add(directory)
+        if self._writer is None:
+            self.save_image(image, save_path, roll)
+            return save_path
+        # Bounded hand-off: at most 2 tickets per writer thread wait in memory
+        self._pending_writes.acquire()
+        future = self._writer.submit(self.save_image, image, save_path, roll)
+        self._write_futures.append((save_path, future))
+        future.add_done_callback(self.write_finished)
+        return save_path
+    
+    def write_finished(self, future):
+        self._pending_writes.release()
+        if future.exception() is not None:
+            self._write_errors += 1
+            logging.error(f"Error writing hall ticket: {future.exception()}")
+    
+    def start_writer(self):
+        if self.writer_threads > 0 and self._writer is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._writer = ThreadPoolExecutor(max_workers=self.writer_threads)
+            self._pending_writes = threading.BoundedSemaphore(self.writer_threads * 2)
+    
+    def flush_writes(self):
+        # Waits for every queued file so checkpoints and manifests never get ahead of the disk
+        if self._writer is not None:
+            for _ in range(self.writer_threads * 2):
+                self._pending_writes.acquire()
+            for _ in range(self.writer_threads * 2):
+                self._pending_writes.release()
+    
+    def take_failed_writes(self):
+        # Paths whose background write raised, for the writes queued since the last call.
+        # Only meaningful after flush_writes, when every queued future has finished.
+        failed = {path for path, future in self._write_futures if future.exception() is not None}
+        self._write_futures = []
+        return failed
+    
+    def stop_writer(self):
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+            if self._write_errors:
+                logging.error(f"{self._write_errors} hall tickets could not be written")
+    
+    def create_hall_ticket(self, student_data):
+        try:
+            with self.metrics.timed("validation"):
+                valid = self.validate_student(student_data)
+            if not valid:
+                return None
+            image = self.render_hall_ticket(student_data)
+            save_path = self.write_hall_ticket(image, student_data)
+            logging.info(f"Hall ticket created for {student_data['Student Name']} ({student_data['Roll Number']})")
+            return save_path
+        except Exception as e:
+            logging.error(f"Error creating hall ticket: {e}")
+            return None
+    
+    def encode_hall_ticket(self, student_data):
+        # Renders and compresses a ticket for a PDF page; the PDF itself is written by the caller
+        try:
+            with self.metrics.timed("validation"):
+                valid = self.validate_student(student_data)
+            if not valid:
+                return None
+            image = self.render_hall_ticket(student_data)
+            with self.metrics.timed("pdf_encode"):
+                if image.mode == "vector":
+                    encoded = image.width, image.height, image.mode, zlib.compress(image.render(), 6)
+                else:
+                    if image.mode not in ('1', 'L'):
+                        image = image.convert('RGB')
+                    encoded = image.width, image.height, image.mode, zlib.compress(image.tobytes(), 6)
+            logging.info(f"Hall ticket rendered for {student_data['Student Name']} ({student_data['Roll Number']})")
+            return encoded
+        except Exception as e:
+            logging.error(f"Error creating hall ticket: {e}")
+            return None
+    
+    def worker_config(self):
+        # Arguments needed to rebuild an equivalent generator inside a worker process
+        return {
+            'csv_path': self.csv_path,
+            'output_dir': self.output_dir,
+            'college_name': self.college_name,
+            'use_template': self.use_template,
+            'output_format': self.output_format,
+            'qr_secret': self.qr_secret,
+            'image_mode': self.image_mode,
+            'png_compress_level': self.png_compress_level,
+            'png_optimize': self.png_optimize,
+            'text_cache_bytes': self.text_cache_bytes,
+            'layout': self.layout,
+            'index_tickets': self.index_tickets,
+            'backend': self.backend,
+        }
+    
+    def checkpoint_path(self):
+        return os.path.join(self.output_dir, 'generation_checkpoint.json')
+    
+    def write_json(self, path, data):
+        # Write to a temporary file first so a crash never leaves a truncated file behind
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+    
+    def source_id(self):
+        # Identifies where rows come from, so a checkpoint is only reused for the same input
+        if self.store is not None:
+            source = f"{os.path.abspath(self.store.db_path)}?{json.dumps(self.student_query, sort_keys=True)}"
+        else:
+            source = os.path.abspath(self.csv_path)
+        if self.shard is not None:
+            source += f"#shard={self.shard['index']}/{self.shard['count']}"
+        return source
+    
+    def source_stamp(self):
+        # Size and modification time of the CSV, so a checkpoint's byte offset is never
+        # applied to a file edited since; the store resumes by roll number instead
+        if self.store is not None:
+            return None
+        try:
+            stat = os.stat(self.csv_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def write_checkpoint(self, next_row, next_offset, next_part=1):
+        checkpoint = {'csv_path': self.source_id(), 'source_stamp': self.source_stamp(),
+                      'row': next_row, 'offset': next_offset, 'part': next_part}
+        self.write_json(self.checkpoint_path(), checkpoint)
+    
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path(), 'r', encoding='utf-8') as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get('csv_path') != self.source_id():
+            logging.warning("Ignoring checkpoint written for a different CSV file")
+            return None
+        if checkpoint.get('source_stamp') != self.source_stamp():
+            logging.warning("Ignoring checkpoint, the CSV file changed since it was written")
+            return None
+        return checkpoint
+    
+    def metrics_path(self):
+        return os.path.join(self.output_dir, 'run_metrics.json')
+    
+    def manifest_path(self):
+        return os.path.join(self.output_dir, 'hall_ticket_manifest.json')
+    
+    def load_manifest(self):
+        # Maps roll number -> {'hash': row digest, 'file': ticket path relative to output_dir}
+        try:
+            with open(self.manifest_path(), 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+            return manifest.get('tickets', {})
+        except (OSError, ValueError):
+            return {}
+    
+    def save_manifest(self, tickets):
+        self.write_json(self.manifest_path(), {'layout_version': self.LAYOUT_VERSION, 'tickets': tickets})
+    
+    def qr_key_id(self):
+        # Identifies the signing key without revealing it, so key rotation reissues tickets
+        if not self.qr_secret:
+            return None
+        return hmac.new(self.qr_secret.encode('utf-8'), b'key-id', hashlib.sha256).hexdigest()[:16]
+    
+    def row_digest(self, student_data):
+        content = json.dumps([self.LAYOUT_VERSION, self.college_name, self.qr_key_id(), self.image_mode,
+                              self.save_options(), student_data], sort_keys=True)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def unchanged_ticket(self, manifest, student_data, digest):
+        # Path of the existing ticket if this row was already rendered with identical content
+        entry = manifest.get(student_data.get('Roll Number'))
+        if not entry or entry['hash'] != digest:
+            return None
+        ticket_path = os.path.join(self.output_dir, entry['file'])
+        return ticket_path if os.path.exists(ticket_path) else None
+    
+    def remove_stale_tickets(self, manifest, seen_rolls):
+        removed = 0
+        stale = [roll for roll in manifest if roll not in seen_rolls]
+        for roll in stale:
+            ticket_path = os.path.join(self.output_dir, manifest.pop(roll)['file'])
+            if os.path.exists(ticket_path):
+                os.remove(ticket_path)
+                removed += 1
+        if stale and self.ticket_index is not None:
+            self.ticket_index.forget(stale)
+        return removed
+    
+    def iter_hall_tickets(self, start_row=0, start_offset=None, start_part=1):
+        # Stream -> validate -> render -> write, holding at most one batch of rows.
+        # Yields (row_number, ticket_path) in input order; failed rows yield None.
+        # In incremental mode rows whose digest matches the manifest are not rendered again.
+        # Stage timings for the run end up in self.metrics and in run_metrics.json.
+        self.metrics = RunMetrics()
+        # Checks normally run on each streamed chunk, so the first ticket does not wait for
+        # the whole file. Only the strict modes read everything first, because they must
+        # refuse the run before a single ticket is written.
+        report = ValidationReport() if self.validation != "off" else None
+        analyzer = ScheduleAnalyzer(self.parse_exam_date) if self.clash_check != "off" else None
+        self.validation_report = report
+        self.schedule_report = analyzer
+        streaming_checks = self.validation != "strict" and self.clash_check != "strict"
+        if not streaming_checks:
+            with self.metrics.timed("validation_pass"):
+                full_report = self.validate_csv(start_row, start_offset, analyzer)
+            if report is not None:
+                report = self.validation_report = full_report
+            self.write_check_reports()
+            if self.gate_failed():
+                logging.error("Pre-generation checks failed, no hall tickets were generated")
+                self.metrics.export(self.metrics_path())
+                return
+        invalid_rows = report.invalid_rows if report is not None else ()
+        executor = None
+        batch_size = self.chunksize
+        if self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=self.workers,
+                                           initializer=_init_worker,
+                                           initargs=(self.worker_config(),))
+            batch_size = self.chunksize * self.workers * 2
+            logging.info(f"Rendering hall tickets with {self.workers} workers (chunksize {self.chunksize})")
+        manifest = self.load_manifest() if self.incremental else None
+        sink = None
+        render = _render_in_worker if executor else self.create_hall_ticket
+        if executor is None and self.output_format in self.FILE_FORMATS:
+            # Worker processes already overlap encoding with rendering, so only the in-process path uses threads
+            self.start_writer()
+        if self.index_tickets and self.output_format in self.FILE_FORMATS:
+            self.ticket_index = TicketIndex(self.output_dir)
+        if self.output_format not in self.FILE_FORMATS:
+            # A resumed run restarts the PDF part that was being written when it stopped
+            sink = PdfTicketSink(self.output_dir, self.n_up, self.tickets_per_file, first_part=start_part)
+            render = _encode_in_worker if executor else self.encode_hall_ticket
+        seen_rolls = set()
+        rendered = unchanged = 0
+        manifest_dirty = False
+        last_save = time.perf_counter()
+        save_cost = 0.0
+        try:
+            rows = self.iter_rows(start_row, start_offset)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                existing = [None] * len(batch)
+                digests = [None] * len(batch)
+                if streaming_checks and (report is not None or analyzer is not None):
+                    with self.metrics.timed("chunk_checks"):
+                        for row_number, row, _ in batch:
+                            if report is not None:
+                                self.validate_row(report, row_number, row)
+                            if analyzer is not None:
+                                analyzer.add_student(row_number, row)
+                if self.registry:
+                    # Reissued rolls carry their serial into the QR payload and the row digest
+                    serials = self.registry.serials(row.get('Roll Number') for _, row, _ in batch)
+                    for _, row, _ in batch:
+                        serial = serials.get(row.get('Roll Number'), 1)
+                        if serial > 1:
+                            row[ISSUE_SERIAL_FIELD] = serial
+                if manifest is not None:
+                    for i, (row_number, row, _) in enumerate(batch):
+                        # A row that is still in the file keeps its ticket even while it fails validation
+                        seen_rolls.add(row.get('Roll Number'))
+                        if row_number in invalid_rows:
+                            continue
+                        digests[i] = self.row_digest(row)
+                        existing[i] = self.unchanged_ticket(manifest, row, digests[i])
+                students = [row for (row_number, row, _), path in zip(batch, existing)
+                            if path is None and row_number not in invalid_rows]
+                issued = []
+                if executor:
+                    results = executor.map(render, students, chunksize=self.chunksize)
+                else:
+                    results = ((render(student), None, None) for student in students)
+                outcomes = []
+                for (row_number, row, next_offset), digest, ticket_path in zip(batch, digests, existing):
+                    if row_number in invalid_rows:
+                        # Rejected by the validation pass, never sent to a renderer
+                        outcomes.append((row_number, row, next_offset, digest, None, False))
+                    elif ticket_path:
+                        outcomes.append((row_number, row, next_offset, digest, ticket_path, False))
+                    else:
+                        ticket_path, samples, records = next(results)
+                        if samples:
+                            self.metrics.add_samples(samples)
+                        if records:
+                            self._index_records.extend(records)
+                        outcomes.append((row_number, row, next_offset, digest, ticket_path, True))
+                # Background writes have to land before a ticket is reported, recorded or checkpointed
+                self.flush_writes()
+                failed_writes = self.take_failed_writes()
+                for row_number, row, next_offset, digest, ticket_path, was_rendered in outcomes:
+                    if not was_rendered:
+                        if ticket_path:
+                            unchanged += 1
+                        else:
+                            self.metrics.failed += 1
+                    else:
+                        if ticket_path in failed_writes:
+                            ticket_path = None
+                        rendered += 1
+                        if sink and ticket_path:
+                            with self.metrics.timed("pdf_write"):
+                                ticket_path = sink.add(ticket_path)
+                            if sink.file_completed:
+                                # PDF runs can only resume from a fully written file
+                                self.write_checkpoint(row_number + 1, next_offset, sink.part)
+                        if ticket_path and self.registry:
+                            issued.append(row)
+                        if manifest is not None and ticket_path:
+                            manifest[row['Roll Number']] = {
+                                'hash': digest,
+                                'file': os.path.relpath(ticket_path, self.output_dir)
+                            }
+                            manifest_dirty = True
+                        if ticket_path:
+                            self.metrics.tickets += 1
+                        else:
+                            self.metrics.failed += 1
+                    if self.store is None:
+                        self.bytes_processed = next_offset
+                    yield row_number, ticket_path
+                last_row, _, next_offset = batch[-1]
+                if self.ticket_index is not None:
+                    with self.metrics.timed("index_write"):
+                        self.ticket_index.record(self.take_index_records())
+                if issued:
+                    self.registry.register(issued, self.qr_secret)
+                if manifest_dirty:
+                    # A rewrite costs time proportional to the whole manifest, so it happens at
+                    # most every MANIFEST_SAVE_SECONDS and never takes more than a tenth of the run
+                    now = time.perf_counter()
+                    if now - last_save >= max(self.MANIFEST_SAVE_SECONDS, 10 * save_cost):
+                        with self.metrics.timed("manifest_save"):
+                            self.save_manifest(manifest)
+                        last_save = time.perf_counter()
+                        save_cost = last_save - now
+                        manifest_dirty = False
+                # The checkpoint never gets ahead of the manifest, or a resume would skip rows
+                # whose tickets the manifest does not know about
+                if sink is None and not manifest_dirty:
+                    self.write_checkpoint(last_row + 1, next_offset)
+            if manifest is not None:
+                # Only a run over the whole file knows which students were removed
+                removed = 0
+                if start_row == 0 and seen_rolls and self.store is None:
+                    removed = self.remove_stale_tickets(manifest, seen_rolls)
+                    manifest_dirty = True
+                if manifest_dirty:
+                    self.save_manifest(manifest)
+                logging.info(f"Incremental run: {rendered} rendered, {unchanged} unchanged, {removed} removed")
+            if sink:
+                with self.metrics.timed("pdf_write"):
+                    sink.close()
+            if streaming_checks:
+                self.write_check_reports()
+            # Only a run that reached the end of its input drops the checkpoint; a cancelled
+            # or failed run keeps it so --resume can continue
+            if os.path.exists(self.checkpoint_path()):
+                os.remove(self.checkpoint_path())
+        finally:
+            if executor:
+                executor.shutdown()
+            self.stop_writer()
+            if executor is None and self.text_cache is not None:
+                # Worker processes keep their own caches, which are not aggregated here
+                self.metrics.extra['text_cache'] = self.text_cache.stats()
+            self.metrics.export(self.metrics_path())
+    
+    def write_check_reports(self):
+        report, analyzer = self.validation_report, self.schedule_report
+        if report is not None:
+            report.write(self.validation_report_path())
+            if not report.ok:
+                logging.warning(f"Validation rejected {len(report.invalid_rows)} rows "
+                                f"({report.counts}), see {self.validation_report_path()}")
+        if analyzer is not None:
+            analyzer.write(self.schedule_report_path())
+            if analyzer.overlap_count:
+                logging.warning(f"{analyzer.overlap_count} overlapping exams found, "
+                                f"see {self.schedule_report_path()}")
+    
+    def gate_failed(self):
+        # True when strict validation or the strict clash check stopped the last run
+        return bool((self.validation == "strict" and self.validation_report is not None
+                     and not self.validation_report.ok)
+                    or (self.clash_check == "strict" and self.schedule_report is not None
+                        and self.schedule_report.overlap_count))
+    
+    def generate_all_hall_tickets(self, resume=False, start_row=0, start_offset=None):
+        start_part = 1
+        if resume:
+            checkpoint = self.load_checkpoint()
+            if checkpoint:
+                start_row, start_offset = checkpoint['row'], checkpoint['offset']
+                start_part = checkpoint.get('part', 1)
+                logging.info(f"Resuming generation from row {start_row} (byte offset {start_offset})")
+        
+        # In PDF modes many tickets share a file, so each output file is listed once
+        generated_tickets = []
+        processed = 0
+        try:
+            for _, ticket_path in self.iter_hall_tickets(start_row, start_offset, start_part):
+                processed += 1
+                if ticket_path and (self.output_format in self.FILE_FORMATS or ticket_path not in generated_tickets[-1:]):
+                    generated_tickets.append(ticket_path)
+        except Exception as e:
+            logging.error(f"Error during hall ticket generation: {e}")
+            return generated_tickets
+        
+        if not processed:
+            if self.gate_failed():
+                # The pre-generation gate already logged why nothing was rendered
+                return []
+            logging.error("No student data found or error reading CSV")
+            return []
+        
+        logging.info(f"Generated {len(generated_tickets)} hall tickets out of {processed} students")
+        return generated_tickets
+
+# Splits one generation job into shards that separate nodes can run independently.
+# The plan file names the input, the partitioning and the render options; each shard
+# renders incrementally into its own directory (so a retry only redoes missing tickets)
+# and writes shard_status.json when complete. merge() checks every shard's manifest
+# against the plan before combining them into one output directory.
+class ShardPlan:
+    PLAN_FILE = 'shard_plan.json'
+    STATUS_FILE = 'shard_status.json'
+    
+    def __init__(self, plan_path):
+        self.plan_path = os.path.abspath(plan_path)
+        self.job_dir = os.path.dirname(self.plan_path)
+        with open(self.plan_path, 'r', encoding='utf-8') as file:
+            self.plan = json.load(file)
+        with open(self.plan_path, 'rb') as file:
+            self.digest = hashlib.sha256(file.read()).hexdigest()
+    
+    @classmethod
+    def create(cls, job_dir, shards, strategy="hash", csv_path=None, store_path=None,
+               student_query=None, options=None):
+        if strategy not in ("hash", "range"):
+            raise ValueError(f"Unknown shard strategy: {strategy}")
+        os.makedirs(job_dir, exist_ok=True)
+        source = {'csv_path': os.path.abspath(csv_path) if csv_path else None,
+                  'store_path': os.path.abspath(store_path) if store_path else None,
+                  'student_query': student_query or {}}
+        boundaries = []
+        if strategy == "range":
+            # Equal-sized roll ranges need one pass over the roll numbers to find the cut points
+            generator = HallTicketGenerator(source['csv_path'], job_dir, store_path=source['store_path'],
+                                            student_query=source['student_query'], text_cache_bytes=0)
+            rolls = sorted({row.get('Roll Number') or '' for _, row, _ in generator.iter_rows()})
+            boundaries = [rolls[len(rolls) * i // shards] for i in range(1, shards)] if rolls else []
+            # Tiny cohorts can repeat a cut point; empty shards are harmless
+        plan = {'shards': shards, 'strategy': strategy, 'boundaries': boundaries,
+                'source': source, 'options': options or {},
+                'created_at': datetime.now().isoformat(timespec='seconds')}
+        plan_path = os.path.join(job_dir, cls.PLAN_FILE)
+        with open(plan_path, 'w', encoding='utf-8') as file:
+            json.dump(plan, file, indent=2)
+        return cls(plan_path)
+    
+    def shard_dir(self, index):
+        return os.path.join(self.job_dir, f"shard-{index:03d}-of-{self.plan['shards']:03d}")
+    
+    def shard(self, index):
+        return {'index': index, 'count': self.plan['shards'], 'strategy': self.plan['strategy'],
+                'boundaries': self.plan['boundaries']}
+    
+    def status_path(self, index):
+        return os.path.join(self.shard_dir(index), self.STATUS_FILE)
+    
+    def load_status(self, index):
+        try:
+            with open(self.status_path(index), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+    
+    def run(self, index, workers=1):
+        # Safe to repeat: finished tickets are kept via the shard manifest and an
+        # interrupted run continues from its checkpoint
+        if not 0 <= index < self.plan['shards']:
+            raise ValueError(f"Shard {index} is outside 0..{self.plan['shards'] - 1}")
+        source = self.plan['source']
+        options = dict(self.plan['options'])
+        options.pop('incremental', None)
+        if os.path.exists(self.status_path(index)):
+            os.remove(self.status_path(index))
+        generator = HallTicketGenerator(source['csv_path'], self.shard_dir(index), workers=workers,
+                                        incremental=True, store_path=source['store_path'],
+                                        student_query=source['student_query'], shard=self.shard(index),
+                                        **options)
+        tickets = generator.generate_all_hall_tickets(resume=True)
+        # Rows rejected by validation can never succeed, so they do not keep a shard open
+        report = generator.validation_report
+        rejected = len(report.invalid_rows) if report is not None else 0
+        failed = generator.metrics.failed - rejected
+        complete = not failed and not generator.gate_failed() and not os.path.exists(generator.checkpoint_path())
+        if complete:
+            generator.write_json(self.status_path(index), {
+                'shard': index, 'plan': self.digest, 'tickets': len(generator.load_manifest()),
+                'finished_at': datetime.now().isoformat(timespec='seconds')})
+            logging.info(f"Shard {index} complete with {len(tickets)} tickets")
+        else:
+            logging.error(f"Shard {index} incomplete ({failed} rows failed), run it again")
+        return complete
+    
+    def merge(self, output_dir, copy_files=False):
+        # Combines shard manifests into output_dir/hall_ticket_manifest.json after checking
+        # that every shard finished under this plan with as many tickets as it reported,
+        # every roll is in the shard the plan assigns it to and appears only once, and
+        # every listed file exists with the size and SHA-256 its shard index recorded.
+        # Tickets are hard-linked where possible so merging does not double disk usage,
+        # and the merged directory gets its own index built from the hashed files.
+        import shutil
+        os.makedirs(output_dir, exist_ok=True)
+        merged = {}
+        records = []
+        problems = []
+        layout_version = None
+        for index in range(self.plan['shards']):
+            status = self.load_status(index)
+            if status is None:
+                problems.append({'shard': index, 'issue': 'not_finished'})
+                continue
+            if status.get('plan') != self.digest:
+                problems.append({'shard': index, 'issue': 'different_plan'})
+                continue
+            shard_dir = self.shard_dir(index)
+            try:
+                with open(os.path.join(shard_dir, 'hall_ticket_manifest.json'), 'r', encoding='utf-8') as file:
+                    manifest = json.load(file)
+            except OSError:
+                # A shard the partitioning left empty never writes a manifest
+                manifest = {}
+            layout_version = manifest.get('layout_version', layout_version)
+            tickets = manifest.get('tickets', {})
+            if len(tickets) != status.get('tickets'):
+                problems.append({'shard': index, 'issue': 'count_mismatch',
+                                 'expected': status.get('tickets'), 'found': len(tickets)})
+            indexed = {}
+            if TicketIndex.exists(shard_dir):
+                indexed = {roll: (size, digest) for roll, _, size, digest in TicketIndex(shard_dir).iter_tickets()}
+            for roll, entry in tickets.items():
+                source_path = os.path.join(shard_dir, entry['file'])
+                expected_size, expected_digest = indexed.get(roll, (None, None))
+                if shard_of(roll, self.plan['shards'], self.plan['strategy'], self.plan['boundaries']) != index:
+                    problems.append({'shard': index, 'roll': roll, 'issue': 'wrong_shard'})
+                    continue
+                if roll in merged:
+                    problems.append({'shard': index, 'roll': roll, 'issue': 'duplicate_roll'})
+                    continue
+                if not os.path.exists(source_path):
+                    problems.append({'shard': index, 'roll': roll, 'issue': 'missing_file'})
+                    continue
+                size, digest = TicketIndex.file_digest(source_path)
+                if expected_size is not None and size != expected_size:
+                    problems.append({'shard': index, 'roll': roll, 'issue': 'size_mismatch'})
+                    continue
+                if expected_digest is not None and digest != expected_digest:
+                    problems.append({'shard': index, 'roll': roll, 'issue': 'hash_mismatch'})
+                    continue
+                target_path = os.path.join(output_dir, entry['file'])
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                if os.path.exists(target_path):
+                    os.remove(target_path)
+                try:
+                    if copy_files:
+                        raise OSError
+                    os.link(source_path, target_path)
+                except OSError:
+                    shutil.copy2(source_path, target_path)
+                merged[roll] = dict(entry, shard=index)
+                records.append((roll, entry['file'], size, digest))
+        TicketIndex(output_dir).record(records)
+        report = {'plan': self.plan_path, 'shards': self.plan['shards'], 'tickets': len(merged),
+                  'ok': not problems, 'problems': problems[:1000]}
+        with open(os.path.join(output_dir, 'hall_ticket_manifest.json'), 'w', encoding='utf-8') as file:
+            json.dump({'layout_version': layout_version, 'tickets': merged}, file)
+        with open(os.path.join(output_dir, 'merge_report.json'), 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        return report
+
+class Application:
+    POLL_INTERVAL_MS = 100
+    POLL_BATCH_SIZE = 500
+    
+    def __init__(self):
+        _import_gui()
+        self.generation_thread = None
+        self.cancel_event = None
+        self.root = Tk()
+        self.root.title("Hall Ticket Generator")
+        self.root.geometry("400x300")
+        self.username = StringVar()
+        self.password = StringVar()
+        self.init_db()
+        self.create_widgets()
+
+    def init_db(self):
+        init_db()
+
+    def create_widgets(self):
+        Label(self.root, text="Hall Ticket Generator", font=("Arial", 16)).pack(pady=10)
+        Label(self.root, text="Username").pack(pady=5)
+        Entry(self.root, textvariable=self.username).pack(pady=5)
+        Label(self.root, text="Password").pack(pady=5)
+        Entry(self.root, textvariable=self.password, show="*").pack(pady=5)
+        
+        # Add button frame for better layout
+        button_frame = Label(self.root)
+        button_frame.pack(pady=5)
+        Button(button_frame, text="Login", command=self.login).pack(side="left", padx=5)
+        Button(button_frame, text="Clear", command=self.clear_login_fields).pack(side="left", padx=5)
+        Button(button_frame, text="Register", command=self.open_register_form).pack(side="left", padx=5)
+
+    def clear_login_fields(self):
+        self.username.set("")
+        self.password.set("")
+
+    def open_register_form(self):
+        register_win = Toplevel(self.root)
+        register_win.title("Register")
+        register_win.geometry("300x200")
+        
+        username = StringVar()
+        password = StringVar()
+        
+        Label(register_win, text="Create Username").pack(pady=5)
+        Entry(register_win, textvariable=username).pack(pady=5)
+        Label(register_win, text="Create Password").pack(pady=5)
+        Entry(register_win, textvariable=password, show="*").pack(pady=5)
+        
+        # Add button frame with Clear option
+        button_frame = Label(register_win)
+        button_frame.pack(pady=10)
+        Button(button_frame, text="Register", command=lambda: self.register(username, password, register_win)).pack(side="left", padx=5)
+        Button(button_frame, text="Clear", command=lambda: self.clear_register_fields(username, password)).pack(side="left", padx=5)
+
+    def clear_register_fields(self, username, password):
+        username.set("")
+        password.set("")
+
+    def register(self, username, password, window):
+        if username.get() and password.get():
+            import sqlite3
+            from werkzeug.security import generate_password_hash
+            try:
+                # Fix: Changed the hash method to 'pbkdf2:sha256' which is supported by werkzeug
+                hashed_password = generate_password_hash(password.get())
+            
+                conn = sqlite3.connect('database.db')
+                c = conn.cursor()
+                c.execute('INSERT INTO users (username, password) VALUES (?, ?)', (username.get(), hashed_password))
+                conn.commit()
+                conn.close()
+                
+                messagebox.showinfo("Registration", "User registered successfully!")
+                window.destroy()
+            except sqlite3.IntegrityError:
+                messagebox.showerror("Registration", "Username already exists. Please choose another.")
+            except Exception as e:
+                messagebox.showerror("Registration Error", f"An error occurred: {str(e)}")
+        else:
+            messagebox.showerror("Registration", "Please enter both username and password")
+
+    def login(self):
+        username = self.username.get()
+        password = self.password.get()
+        
+        if not username or not password:
+            messagebox.showerror("Login", "Please enter both username and password")
+            return
+            
+        import sqlite3
+        from werkzeug.security import check_password_hash
+        try:
+            conn = sqlite3.connect('database.db')
+            c = conn.cursor()
+            c.execute('SELECT * FROM users WHERE username = ?', (username,))
+            user = c.fetchone()
+            conn.close()
+            
+            if user and check_password_hash(user[2], password):
+                messagebox.showinfo("Login", "Login successful!")
+                self.root.withdraw()  # Hide the login window
+                self.upload_window()
+            else:
+                messagebox.showerror("Login", "Invalid username or password")
+        except Exception as e:
+            messagebox.showerror("Login Error", f"An error occurred: {str(e)}")
+
+    def upload_window(self):
+        upload_win = Toplevel(self.root)
+        upload_win.title("Hall Ticket Generator")
+        upload_win.geometry("500x480")
+        upload_win.protocol("WM_DELETE_WINDOW", self.close_application)
+        
+        Label(upload_win, text="Generate Hall Tickets", font=("Arial", 16)).pack(pady=10)
+        
+        frame = Label(upload_win)
+        frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        self.college_name_var = StringVar(value="East Point College")
+        Label(frame, text="College Name:").pack(anchor="w", pady=5)
+        Entry(frame, textvariable=self.college_name_var, width=40).pack(anchor="w", pady=5)
+        
+        self.output_dir_var = StringVar(value="output")
+        Label(frame, text="Output Directory:").pack(anchor="w", pady=5)
+        dir_frame = Label(frame)
+        dir_frame.pack(fill="x", pady=5)
+        Entry(dir_frame, textvariable=self.output_dir_var, width=30).pack(side="left")
+        Button(dir_frame, text="Browse", command=self.browse_output_dir).pack(side="left", padx=5)
+        
+        # Add button frame with Clear option
+        button_frame = Label(frame)
+        button_frame.pack(pady=10)
+        Button(button_frame, text="Upload CSV & Generate Tickets", command=self.upload_csv).pack(side="left", padx=5)
+        Button(button_frame, text="Clear Form", command=self.clear_upload_form).pack(side="left", padx=5)
+        
+        # Progress of the background generation run
+        progress_frame = Label(frame)
+        progress_frame.pack(fill="x", pady=5)
+        self.progress_bar = ttk.Progressbar(progress_frame, orient="horizontal", mode="determinate", maximum=100)
+        self.progress_bar.pack(side="left", fill="x", expand=True)
+        self.cancel_button = Button(progress_frame, text="Cancel", command=self.cancel_generation, state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+        self.progress_var = StringVar(value="")
+        Label(frame, textvariable=self.progress_var).pack(anchor="w")
+        
+        list_frame = Label(upload_win)
+        list_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        Label(list_frame, text="Generated Hall Tickets:").pack(anchor="w")
+        self.hall_ticket_list = Listbox(list_frame, width=50, height=10)
+        self.hall_ticket_list.pack(fill="both", expand=True, pady=5)
+        
+        # Add button frame for ticket operations
+        ticket_button_frame = Label(list_frame)
+        ticket_button_frame.pack(pady=5)
+        Button(ticket_button_frame, text="Open Selected Ticket", command=self.open_selected_ticket).pack(side="left", padx=5)
+        Button(ticket_button_frame, text="Clear All Tickets", command=self.clear_all_tickets).pack(side="left", padx=5)
+    
+    def browse_output_dir(self):
+        directory = filedialog.askdirectory()
+        if directory:
+            self.output_dir_var.set(directory)
+    
+    def clear_upload_form(self):
+        self.college_name_var.set("East Point College")  # Reset to default
+        self.output_dir_var.set("output")  # Reset to default
+        self.hall_ticket_list.delete(0, "end")  # Clear the listbox
+        messagebox.showinfo("Clear", "Form has been cleared")
+    
+    def clear_all_tickets(self):
+        if messagebox.askyesno("Confirm", "Are you sure you want to delete all generated hall tickets?"):
+            output_dir = self.output_dir_var.get()
+            if TicketIndex.exists(output_dir):
+                try:
+                    # The index knows every ticket, so nothing has to scan the directory
+                    deleted_count = TicketIndex(output_dir).clear()
+                    self.hall_ticket_list.delete(0, "end")
+                    messagebox.showinfo("Success", f"{deleted_count} hall tickets have been deleted")
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to delete tickets: {str(e)}")
+            elif os.path.exists(output_dir):
+                try:
+                    # Output written before the ticket index existed: delete hall ticket files by name
+                    suffixes = tuple(f"_hall_ticket{ext}" for ext in HallTicketGenerator.FILE_FORMATS.values())
+                    deleted_count = 0
+                    for file in os.listdir(output_dir):
+                        if file.endswith(suffixes):
+                            os.remove(os.path.join(output_dir, file))
+                            deleted_count += 1
+                    
+                    # Clear the listbox
+                    self.hall_ticket_list.delete(0, "end")
+                    messagebox.showinfo("Success", f"{deleted_count} hall tickets have been deleted")
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to delete tickets: {str(e)}")
+            else:
+                messagebox.showinfo("Info", "Output directory does not exist")
+    
+    def open_selected_ticket(self):
+        selection = self.hall_ticket_list.curselection()
+        if selection:
+            ticket_name = self.hall_ticket_list.get(selection[0])
+            output_dir = self.output_dir_var.get()
+            ticket_path = None
+            if TicketIndex.exists(output_dir):
+                # The list shows file names; the index maps the roll number to its subdirectory
+                indexed = TicketIndex(output_dir).lookup(ticket_name.rsplit('_hall_ticket', 1)[0])
+                ticket_path = indexed[0] if indexed else None
+            elif os.path.exists(os.path.join(output_dir, ticket_name)):
+                ticket_path = os.path.join(output_dir, ticket_name)
+            
+            if ticket_path:
+                try:
+                    # Platform independent way to open files
+                    import subprocess
+                    import sys
+                    
+                    if sys.platform == 'win32':
+                        os.startfile(ticket_path)
+                    elif sys.platform == 'darwin':  # macOS
+                        subprocess.run(['open', ticket_path], check=True)
+                    else:  # Linux
+                        subprocess.run(['xdg-open', ticket_path], check=True)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to open file: {str(e)}")
+            else:
+                messagebox.showerror("Error", "File not found")
+    
+    def upload_csv(self):
+        if self.generation_thread and self.generation_thread.is_alive():
+            messagebox.showinfo("Busy", "Hall tickets are still being generated")
+            return
+        
+        csv_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if not csv_path:
+            return
+            
+        output_dir = self.output_dir_var.get()
+        college_name = self.college_name_var.get()
+        
+        # Clear the listbox
+        self.hall_ticket_list.delete(0, "end")
+        
+        try:
+            # Create output directory if it doesn't exist
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            return
+        
+        # Generation runs on a worker thread; the Tk loop drains its queue in poll_generation
+        self.generation_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.generation_started = time.perf_counter()
+        self.generation_output_dir = output_dir
+        self.generated_count = 0
+        self.progress_bar["value"] = 0
+        self.progress_var.set("Starting...")
+        self.cancel_button.config(state="normal")
+        self.generation_thread = threading.Thread(
+            target=self.run_generation, args=(csv_path, output_dir, college_name), daemon=True)
+        self.generation_thread.start()
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_generation)
+    
+    def run_generation(self, csv_path, output_dir, college_name):
+        # Worker thread: never touches Tk widgets, only the queue
+        try:
+            generator = HallTicketGenerator(csv_path, output_dir, college_name)
+            total_bytes = max(os.path.getsize(csv_path), 1)
+            tickets = generator.iter_hall_tickets()
+            try:
+                for _, ticket_path in tickets:
+                    if self.cancel_event.is_set():
+                        break
+                    self.generation_queue.put(("ticket", ticket_path, generator.bytes_processed / total_bytes))
+            finally:
+                tickets.close()
+            self.generation_queue.put(("done", self.cancel_event.is_set(), None))
+        except Exception as e:
+            self.generation_queue.put(("error", str(e), None))
+    
+    def poll_generation(self):
+        names = []
+        finished = None
+        fraction = None
+        # Bounded drain so a fast worker cannot starve the event loop
+        for _ in range(self.POLL_BATCH_SIZE):
+            try:
+                kind, value, progress = self.generation_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "ticket":
+                fraction = progress
+                if value:
+                    names.append(os.path.basename(value))
+            else:
+                finished = (kind, value)
+                break
+        
+        if names:
+            self.hall_ticket_list.insert("end", *names)
+            self.generated_count += len(names)
+        if fraction is not None:
+            elapsed = time.perf_counter() - self.generation_started
+            rate = self.generated_count / elapsed if elapsed else 0
+            eta = elapsed * (1 - fraction) / fraction if fraction else 0
+            self.progress_bar["value"] = fraction * 100
+            self.progress_var.set(f"{self.generated_count} tickets, {rate:.1f} tickets/s, ETA {eta:.0f}s")
+        
+        if finished is None:
+            self.root.after(self.POLL_INTERVAL_MS, self.poll_generation)
+            return
+        
+        self.cancel_button.config(state="disabled")
+        kind, value = finished
+        if kind == "error":
+            self.progress_var.set("Failed")
+            messagebox.showerror("Error", f"An error occurred: {value}")
+        elif value:
+            self.progress_var.set(f"Cancelled after {self.generated_count} tickets")
+            messagebox.showinfo("Cancelled", f"Generation cancelled, {self.generated_count} hall tickets were generated")
+        elif self.generated_count:
+            self.progress_bar["value"] = 100
+            self.progress_var.set(f"Done: {self.generated_count} tickets")
+            messagebox.showinfo("Success", f"{self.generated_count} hall tickets generated in {self.generation_output_dir}")
+        else:
+            self.progress_var.set("")
+            messagebox.showwarning("Warning", "No hall tickets were generated. Check the log file for details.")
+    
+    def cancel_generation(self):
+        if self.cancel_event:
+            self.cancel_event.set()
+            self.progress_var.set("Cancelling...")
+    
+    def close_application(self):
+        if self.cancel_event:
+            self.cancel_event.set()
+        self.root.destroy()
+    
+    def run(self):
+        self.root.mainloop()
+
+
+def main(argv=None):
+    # Without a subcommand the GUI starts, as before; "generate" runs headless
+    import argparse
+    parser = argparse.ArgumentParser(description="Hall Ticket Generator")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("gui", help="start the login and upload GUI")
+    
+    def add_source_arguments(sub):
+        sub.add_argument("csv_path", nargs="?", help="exam schedule CSV (omit with --from-db)")
+        sub.add_argument("--from-db", dest="store_path", help="render students imported into this SQLite file")
+        sub.add_argument("--course", help="with --from-db, only this course")
+        sub.add_argument("--semester", help="with --from-db, only this semester")
+        sub.add_argument("--roll-from", help="with --from-db, first roll number (inclusive)")
+        sub.add_argument("--roll-to", help="with --from-db, last roll number (inclusive)")
+    
+    def add_render_arguments(sub):
+        sub.add_argument("--college-name", default="COLLEGE NAME")
+        sub.add_argument("--chunksize", type=int, default=32, help="rows handed to a worker at a time")
+        sub.add_argument("-f", "--format", dest="output_format", choices=["png", "webp", "tiff", "svg", "pdf", "sheets"],
+                         default="png")
+        sub.add_argument("--backend", choices=["pillow", "vector"], default="pillow",
+                         help="vector draws PDF output as lines and text instead of images (svg always does)")
+        sub.add_argument("--image-mode", choices=["L", "1", "RGB"], default="L",
+                         help="L is grayscale, 1 is bilevel (smallest files)")
+        sub.add_argument("--png-compress-level", type=int, default=6, choices=range(10), metavar="0-9")
+        sub.add_argument("--png-optimize", action="store_true", help="extra PNG optimization pass")
+        sub.add_argument("--writer-threads", type=int, default=2, help="background encoder/writer threads")
+        sub.add_argument("--validation", choices=["off", "report", "strict"], default="report",
+                         help="report skips invalid rows, strict aborts before rendering anything")
+        sub.add_argument("--clash-check", choices=["off", "report", "strict"], default="off",
+                         help="detect overlapping exams; strict refuses to generate while any exist")
+        sub.add_argument("--text-cache-mb", type=float, default=8, help="text sprite cache budget, 0 disables it")
+        sub.add_argument("--layout", choices=["flat", "hashed"], default="flat",
+                         help="hashed spreads ticket files over subdirectories for very large cohorts")
+        sub.add_argument("--n-up", type=int, default=4, help="tickets per A4 page for --format sheets")
+        sub.add_argument("--tickets-per-file", type=int, default=1000, help="tickets per PDF file")
+    
+    def render_options(args):
+        return {'college_name': args.college_name, 'chunksize': args.chunksize,
+                'output_format': args.output_format, 'n_up': args.n_up,
+                'tickets_per_file': args.tickets_per_file, 'image_mode': args.image_mode,
+                'png_compress_level': args.png_compress_level, 'png_optimize': args.png_optimize,
+                'writer_threads': args.writer_threads,
+                'text_cache_bytes': int(args.text_cache_mb * 1024 * 1024),
+                'validation': args.validation, 'clash_check': args.clash_check, 'layout': args.layout,
+                'backend': args.backend}
+    
+    def student_selection(args):
+        if not args.csv_path and not args.store_path:
+            parser.error(f"{args.command} needs a CSV path or --from-db")
+        return {key: value for key, value in (('course', args.course), ('semester', args.semester),
+                                              ('roll_from', args.roll_from), ('roll_to', args.roll_to))
+                if value is not None}
+    
+    gen = subparsers.add_parser("generate", help="generate hall tickets without the GUI")
+    add_source_arguments(gen)
+    gen.add_argument("-o", "--output-dir", default="output")
+    gen.add_argument("-w", "--workers", type=int, default=1, help="render processes, 0 for one per core")
+    add_render_arguments(gen)
+    gen.add_argument("--incremental", action="store_true", help="only render new or changed rows")
+    gen.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    gen.add_argument("--registry", dest="registry_path", help="SQLite file to record issued tickets in")
+    
+    plan = subparsers.add_parser("shard-plan", help="split a generation job into shards for several nodes")
+    add_source_arguments(plan)
+    plan.add_argument("-o", "--job-dir", required=True, help="directory for the plan and shard outputs")
+    plan.add_argument("-n", "--shards", type=int, required=True)
+    plan.add_argument("--by", dest="strategy", choices=["hash", "range"], default="hash",
+                      help="partition by roll-number hash or by sorted roll ranges")
+    add_render_arguments(plan)
+    
+    shard_run = subparsers.add_parser("shard-run", help="run one shard of a plan (safe to retry)")
+    shard_run.add_argument("plan_path", help="shard_plan.json written by shard-plan")
+    shard_run.add_argument("index", nargs="?", type=int, help="shard to run")
+    shard_run.add_argument("--all", action="store_true",
+                           help="run every unfinished shard here, each in its own process")
+    shard_run.add_argument("-w", "--workers", type=int, default=1, help="render processes per shard")
+    
+    merge = subparsers.add_parser("shard-merge", help="verify finished shards and combine their output")
+    merge.add_argument("plan_path", help="shard_plan.json written by shard-plan")
+    merge.add_argument("-o", "--output-dir", required=True)
+    merge.add_argument("--copy", action="store_true", help="copy tickets instead of hard-linking them")
+    
+    check = subparsers.add_parser("validate", help="check a schedule CSV without rendering")
+    check.add_argument("csv_path", help="exam schedule CSV")
+    check.add_argument("-o", "--output-dir", default="output", help="where validation_report.json is written")
+    
+    tickets = subparsers.add_parser("tickets", help="list, find or delete generated tickets via the index")
+    tickets.add_argument("output_dir")
+    tickets.add_argument("action", choices=["list", "find", "clear"])
+    tickets.add_argument("roll", nargs="?", help="roll number for find, roll prefix for list")
+    
+    load = subparsers.add_parser("import", help="load schedule CSVs into the SQLite student store")
+    load.add_argument("csv_paths", nargs="+", help="exam schedule CSVs")
+    load.add_argument("--db", dest="store_path", default="database.db")
+    
+    revoke = subparsers.add_parser("revoke", help="revoke or reissue tickets in the registry")
+    revoke.add_argument("rolls", nargs="+", help="roll numbers")
+    revoke.add_argument("--registry", dest="registry_path", default="database.db")
+    revoke.add_argument("--reissue", action="store_true",
+                        help="invalidate the printed tickets but allow a new ticket on the next run")
+    
+    serve = subparsers.add_parser("serve-verifier", help="serve QR verification over HTTP")
+    serve.add_argument("--registry", dest="registry_path", default="database.db")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "generate":
+        selection = student_selection(args)
+        start = time.perf_counter()
+        generator = HallTicketGenerator(args.csv_path, args.output_dir, workers=args.workers,
+                                        incremental=args.incremental, registry_path=args.registry_path,
+                                        store_path=args.store_path, student_query=selection,
+                                        **render_options(args))
+        tickets = generator.generate_all_hall_tickets(resume=args.resume)
+        print(f"{len(tickets)} hall ticket files written to {args.output_dir} "
+              f"in {time.perf_counter() - start:.1f}s")
+        print(f"Stage timings: {generator.metrics_path()}")
+        report = generator.validation_report
+        if report is not None and not report.ok:
+            print(f"{len(report.invalid_rows)} rows failed validation: {generator.validation_report_path()}")
+        schedule = generator.schedule_report
+        if schedule is not None and schedule.overlap_count:
+            print(f"{schedule.overlap_count} overlapping exams: {generator.schedule_report_path()}")
+        return 0 if tickets else 1
+    
+    if args.command == "validate":
+        generator = HallTicketGenerator(args.csv_path, args.output_dir)
+        analyzer = ScheduleAnalyzer(generator.parse_exam_date)
+        report = generator.validate_csv(analyzer=analyzer)
+        report.write(generator.validation_report_path())
+        analyzer.write(generator.schedule_report_path())
+        print(f"{report.rows_checked} rows checked, {len(report.invalid_rows)} invalid")
+        for code, count in sorted(report.counts.items()):
+            print(f"  {code}: {count}")
+        print(f"{analyzer.overlap_count} overlapping exams, "
+              f"{analyzer.same_day_count} students with more than one exam on a day")
+        print(f"Reports: {generator.validation_report_path()}, {generator.schedule_report_path()}")
+        return 0 if report.ok and not analyzer.overlap_count else 1
+    
+    if args.command == "shard-plan":
+        selection = student_selection(args)
+        if args.output_format not in HallTicketGenerator.FILE_FORMATS:
+            parser.error("sharded runs write one file per ticket, choose png, webp, tiff or svg")
+        if args.shards < 1:
+            parser.error("--shards must be at least 1")
+        shard_plan = ShardPlan.create(args.job_dir, args.shards, args.strategy, args.csv_path,
+                                      args.store_path, selection, render_options(args))
+        print(f"{args.shards} shards planned by {args.strategy}: {shard_plan.plan_path}")
+        return 0
+    
+    if args.command == "shard-run":
+        shard_plan = ShardPlan(args.plan_path)
+        if args.all:
+            import subprocess
+            # Separate processes, exactly as separate nodes would run them
+            pending = [index for index in range(shard_plan.plan['shards'])
+                       if shard_plan.load_status(index) is None]
+            processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "shard-run",
+                                           shard_plan.plan_path, str(index), "-w", str(args.workers)])
+                         for index in pending]
+            failed = [index for index, process in zip(pending, processes) if process.wait() != 0]
+            print(f"{len(pending) - len(failed)} of {len(pending)} shards finished"
+                  + (f", rerun {failed}" if failed else ""))
+            return 1 if failed else 0
+        if args.index is None:
+            parser.error("shard-run needs a shard index or --all")
+        return 0 if shard_plan.run(args.index, args.workers) else 1
+    
+    if args.command == "shard-merge":
+        report = ShardPlan(args.plan_path).merge(args.output_dir, args.copy)
+        print(f"{report['tickets']} tickets merged into {args.output_dir}, "
+              f"{len(report['problems'])} problems (see merge_report.json)")
+        return 0 if report['ok'] else 1
+    
+    if args.command == "tickets":
+        if not TicketIndex.exists(args.output_dir):
+            print(f"No ticket index in {args.output_dir}", file=sys.stderr)
+            return 1
+        index = TicketIndex(args.output_dir)
+        if args.action == "find":
+            if not args.roll:
+                parser.error("tickets find needs a roll number")
+            found = index.lookup(args.roll)
+            if found is None:
+                print(f"{args.roll} has no ticket", file=sys.stderr)
+                return 1
+            print(f"{found[0]}\t{found[1]}\t{found[2]}")
+        elif args.action == "list":
+            for roll, path, size, digest in index.iter_tickets(args.roll):
+                print(f"{roll}\t{path}\t{size}\t{digest}")
+        else:
+            print(f"{index.clear()} hall tickets deleted from {args.output_dir}")
+        return 0
+    
+    if args.command == "import":
+        store = StudentStore(args.store_path)
+        failed = False
+        for csv_path in args.csv_paths:
+            start = time.perf_counter()
+            summary = store.import_csv(csv_path)
+            print(f"{summary['stored']} students stored from {summary['rows']} rows of {csv_path} "
+                  f"in {time.perf_counter() - start:.1f}s ({summary['replaced']} replaced earlier imports)")
+            if summary['blank_roll']:
+                print(f"  {summary['blank_roll']} rows skipped: no roll number")
+                failed = True
+            if summary['duplicate_in_file']:
+                print(f"  {summary['duplicate_in_file']} rows repeated an earlier roll number; the last one was kept")
+                failed = True
+        print(f"{store.count()} students in {args.store_path}")
+        return 1 if failed else 0
+    
+    if args.command == "revoke":
+        if not os.path.exists(args.registry_path):
+            print(f"No registry at {args.registry_path}", file=sys.stderr)
+            return 1
+        registry = TicketRegistry(args.registry_path)
+        missing = []
+        for roll in args.rolls:
+            if args.reissue:
+                serial = registry.reissue(roll)
+                if serial is None:
+                    missing.append(roll)
+                else:
+                    print(f"{roll}: earlier tickets revoked, next ticket is issue {serial}")
+            elif registry.revoke(roll):
+                print(f"{roll}: revoked")
+            else:
+                missing.append(roll)
+        for roll in missing:
+            print(f"{roll}: no issued ticket", file=sys.stderr)
+        return 1 if missing else 0
+    
+    if args.command == "serve-verifier":
+        secret = os.environ.get('HALL_TICKET_SECRET')
+        if not secret:
+            print("HALL_TICKET_SECRET must be set to verify signed tickets", file=sys.stderr)
+            return 1
+        TicketVerifier(args.registry_path, secret).serve(args.host, args.port)
+        return 0
+    
+    app = Application()
+    app.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file